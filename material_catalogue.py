@@ -0,0 +1,251 @@
+import bpy
+import os
+import sys
+import json
+import math
+import hashlib
+import html
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tile_render import save_contact_sheet
+
+# --- Configuration ---
+LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "materials")
+OUTPUT_DIR = "renders/material_catalogue"
+THUMBNAIL_SIZE = 256  # Width and height of each thumbnail in pixels
+THUMBNAIL_SAMPLES = 16  # EEVEE samples per thumbnail
+MAX_WORKERS = 4  # Maximum number of Blender instances rendering thumbnails
+SHEET_COLUMNS = 6  # Thumbnails per row in the PNG contact sheet
+
+# Usage:
+#   blender -b --factory-startup -P material_catalogue.py -- [library dir] [--plane] [--workers N]
+# Thumbnails are cached per .blend content hash in <OUTPUT_DIR>/cache, so only new or
+# changed material files are rendered again.
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+
+def cache_dir_for(cache_root, blend_hash, shape):
+    return os.path.join(cache_root, f"{blend_hash}_{shape.lower()}")
+
+
+# --- Worker: render thumbnails in one Blender session ---
+def setup_preview_scene(shape):
+    """Build a minimal scene with a preview sphere or plane, camera and lights"""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    if shape == 'PLANE':
+        bpy.ops.mesh.primitive_plane_add(size=2.0, rotation=(math.radians(90), 0, 0))
+    else:
+        bpy.ops.mesh.primitive_uv_sphere_add(segments=64, ring_count=32, radius=1.0)
+        bpy.ops.object.shade_smooth()
+    preview_object = bpy.context.active_object
+
+    camera_data = bpy.data.cameras.new("Camera")
+    camera_data.type = 'ORTHO'
+    camera_data.ortho_scale = 2.3
+    camera = bpy.data.objects.new("Camera", camera_data)
+    camera.location = (0, -5, 0)
+    camera.rotation_euler = (math.radians(90), 0, 0)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+
+    for name, location, energy in (("Key", (-3, -4, 4), 800), ("Fill", (4, -3, 1), 250)):
+        light_data = bpy.data.lights.new(name, type='AREA')
+        light_data.energy = energy
+        light_data.size = 3
+        light = bpy.data.objects.new(name, light_data)
+        light.location = location
+        scene.collection.objects.link(light)
+        direction = preview_object.location - light.location
+        light.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
+
+    world = bpy.data.worlds.new("World")
+    world.color = (0.05, 0.05, 0.05)
+    scene.world = world
+
+    scene.render.engine = 'BLENDER_EEVEE_NEXT'
+    scene.eevee.taa_render_samples = THUMBNAIL_SAMPLES
+    scene.render.resolution_x = THUMBNAIL_SIZE
+    scene.render.resolution_y = THUMBNAIL_SIZE
+    scene.render.resolution_percentage = 100
+    scene.render.image_settings.file_format = 'PNG'
+    return scene, preview_object
+
+
+def render_thumbnails(task_file):
+    """Render every material of every .blend listed in task_file into its cache directory"""
+    with open(task_file) as f:
+        task = json.load(f)
+
+    scene, preview_object = setup_preview_scene(task["shape"])
+
+    for entry in task["blends"]:
+        blend_path = entry["path"]
+        cache_dir = entry["cache_dir"]
+        os.makedirs(cache_dir, exist_ok=True)
+        print(f"Rendering materials of {blend_path}")
+
+        try:
+            with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+                data_to.materials = data_from.materials
+        except OSError as e:
+            print(f"Error: Could not load {blend_path}: {e}")
+            continue
+
+        thumbnails = []
+        for material in data_to.materials:
+            if material is None:
+                continue
+            preview_object.data.materials.clear()
+            preview_object.data.materials.append(material)
+
+            thumbnail = f"{safe_name(material.name)}.png"
+            scene.render.filepath = os.path.join(cache_dir, thumbnail)
+            bpy.ops.render.render(write_still=True)
+            thumbnails.append({"material": material.name, "file": thumbnail})
+
+        # Written last, so a cache directory without it is treated as not rendered
+        with open(os.path.join(cache_dir, "materials.json"), 'w') as f:
+            json.dump({"source": blend_path, "thumbnails": thumbnails}, f, indent=2)
+
+        # Drop the appended materials and their textures before the next file
+        preview_object.data.materials.clear()
+        for material in data_to.materials:
+            if material is not None:
+                bpy.data.materials.remove(material)
+        bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+
+
+# --- Coordinator: find stale thumbnails, render them in parallel, build the catalogue ---
+def write_catalogue_html(entries, html_path):
+    cards = []
+    for entry in entries:
+        for thumbnail in entry["thumbnails"]:
+            image = os.path.relpath(os.path.join(entry["cache_dir"], thumbnail["file"]), os.path.dirname(html_path))
+            cards.append(
+                f'<figure><img src="{html.escape(image.replace(os.sep, "/"))}" loading="lazy">'
+                f'<figcaption><b>{html.escape(thumbnail["material"])}</b><br>'
+                f'{html.escape(entry["name"])}</figcaption></figure>'
+            )
+
+    with open(html_path, 'w') as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Material Catalogue</title>\n"
+                "<style>body{font-family:sans-serif;background:#222;color:#ddd}"
+                "main{display:flex;flex-wrap:wrap;gap:12px}figure{margin:0;width:"
+                f"{THUMBNAIL_SIZE}px}}img{{width:100%}}figcaption{{font-size:12px;word-break:break-all}}"
+                "</style></head>\n<body><h1>Material Catalogue</h1><main>\n")
+        f.write("\n".join(cards))
+        f.write("\n</main></body></html>\n")
+
+
+def build_catalogue(library_dir, output_dir, shape, num_workers):
+    cache_root = os.path.join(output_dir, "cache")
+    os.makedirs(cache_root, exist_ok=True)
+
+    blend_files = []
+    for root, _, files in os.walk(library_dir):
+        blend_files.extend(os.path.join(root, name) for name in files if name.endswith(".blend"))
+    blend_files.sort()
+    print(f"Found {len(blend_files)} material files in {library_dir}")
+
+    entries = []
+    stale = []
+    for blend_path in blend_files:
+        cache_dir = cache_dir_for(cache_root, file_hash(blend_path), shape)
+        # Asset folders are named "<name>_<uuid>"
+        name = os.path.basename(os.path.dirname(blend_path)).split("_")[0]
+        entry = {"path": blend_path, "cache_dir": cache_dir, "name": name}
+        entries.append(entry)
+        if not os.path.exists(os.path.join(cache_dir, "materials.json")):
+            stale.append(entry)
+
+    print(f"{len(blend_files) - len(stale)} cached, {len(stale)} to render")
+
+    if stale:
+        num_workers = max(1, min(num_workers, len(stale), os.cpu_count() or 1))
+        threads = max(1, (os.cpu_count() or 1) // num_workers)
+        processes = []
+        for worker_id in range(num_workers):
+            task_file = os.path.join(output_dir, f"worker_{worker_id}.json")
+            with open(task_file, 'w') as f:
+                json.dump({"shape": shape, "blends": stale[worker_id::num_workers]}, f)
+
+            cmd = [
+                bpy.app.binary_path,
+                "--factory-startup",
+                "--threads", str(threads),
+                "--background",
+                "--python", os.path.abspath(__file__),
+                "--",
+                "--render-thumbnails", task_file
+            ]
+            log_file = os.path.join(output_dir, f"worker_{worker_id}.log")
+            log = open(log_file, 'w')
+            print(f"Starting worker {worker_id} with {len(stale[worker_id::num_workers])} file(s)...")
+            processes.append((subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log, log_file, task_file))
+
+        for process, log, log_file, task_file in processes:
+            process.wait()
+            log.close()
+            if process.returncode != 0:
+                print(f"ERROR in thumbnail worker, see {log_file}")
+            else:
+                os.remove(log_file)
+            os.remove(task_file)
+
+    # --- Collect everything that is cached now ---
+    image_paths = []
+    for entry in entries:
+        manifest = os.path.join(entry["cache_dir"], "materials.json")
+        if not os.path.exists(manifest):
+            print(f"Warning: No thumbnails for {entry['path']}")
+            entry["thumbnails"] = []
+            continue
+        with open(manifest) as f:
+            entry["thumbnails"] = json.load(f)["thumbnails"]
+        image_paths.extend(os.path.join(entry["cache_dir"], t["file"]) for t in entry["thumbnails"])
+
+    html_path = os.path.join(output_dir, "index.html")
+    write_catalogue_html(entries, html_path)
+    print(f"Catalogue page saved to: {html_path}")
+
+    if image_paths:
+        sheet_path = os.path.join(output_dir, "contact_sheet.png")
+        save_contact_sheet(image_paths, sheet_path, columns=min(SHEET_COLUMNS, len(image_paths)))
+        print(f"Contact sheet saved to: {sheet_path}")
+
+
+# --- Main Script ---
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+if "--render-thumbnails" in argv:
+    render_thumbnails(argv[argv.index("--render-thumbnails") + 1])
+else:
+    shape = 'SPHERE'
+    if "--plane" in argv:
+        argv.remove("--plane")
+        shape = 'PLANE'
+
+    num_workers = MAX_WORKERS
+    if "--workers" in argv:
+        idx = argv.index("--workers")
+        num_workers = int(argv[idx + 1])
+        del argv[idx:idx + 2]
+
+    library_dir = os.path.abspath(argv[0]) if argv else LIBRARY_DIR
+    build_catalogue(library_dir, os.path.abspath(OUTPUT_DIR), shape, num_workers)
+
+bpy.ops.wm.quit_blender()
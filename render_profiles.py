@@ -0,0 +1,65 @@
+import os
+import sys
+import glob
+
+# --- Configuration ---
+CYCLES_FAST_SAMPLES = 16  # Cycles samples in fast mode, adaptive sampling stops earlier where it can
+CYCLES_SAMPLES = 128  # Cycles samples in high quality mode
+CYCLES_ADAPTIVE_THRESHOLD = 0.05  # Noise level at which adaptive sampling stops, denoising cleans up the rest
+
+# Render engine selection shared by the typewriter scripts, which import it with
+#   sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+#   import render_profiles
+# and pick the engine with --engine eevee|cycles|auto.
+
+
+def gpu_available():
+    """Best guess whether EEVEE can get a hardware GPU context on this machine.
+
+    Headless Linux nodes render EEVEE through EGL, which needs a DRM render node or
+    the NVIDIA driver. Without either Blender falls back to software GL or fails.
+    """
+    if not sys.platform.startswith("linux"):
+        return True
+    return bool(glob.glob("/dev/dri/renderD*")) or os.path.exists("/dev/nvidiactl")
+
+
+def resolve_render_engine(engine):
+    """'eevee', 'cycles' or 'auto' -> 'eevee' or 'cycles'"""
+    engine = engine.lower()
+    if engine == "auto":
+        engine = "eevee" if gpu_available() else "cycles"
+        print(f"Render engine: {engine} ({'GPU found' if engine == 'eevee' else 'no GPU, using Cycles on the CPU'})")
+    if engine not in ("eevee", "cycles"):
+        print(f"Error: Unknown render engine '{engine}', use eevee, cycles or auto")
+        sys.exit(1)
+    return engine
+
+
+def setup_cycles_cpu(scene, fast_mode):
+    """Cycles CPU profile tuned for flat text, close to the look of the EEVEE templates"""
+    scene.render.engine = 'CYCLES'
+    cycles = scene.cycles
+    cycles.device = 'CPU'
+    cycles.samples = CYCLES_FAST_SAMPLES if fast_mode else CYCLES_SAMPLES
+    cycles.use_adaptive_sampling = True
+    cycles.adaptive_threshold = CYCLES_ADAPTIVE_THRESHOLD
+    cycles.use_denoising = True
+    cycles.denoiser = 'OPENIMAGEDENOISE'
+    cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
+
+    # Flat lettering only needs direct light plus one bounce of ambient fill
+    cycles.max_bounces = 4
+    cycles.diffuse_bounces = 1
+    cycles.glossy_bounces = 1
+    cycles.transmission_bounces = 2
+    cycles.volume_bounces = 0
+    cycles.transparent_max_bounces = 8
+    cycles.caustics_reflective = False
+    cycles.caustics_refractive = False
+    cycles.sample_clamp_indirect = 10.0
+
+    # Same pixel filter as EEVEE so the letter edges match
+    cycles.filter_width = scene.render.filter_size
+    # Only the text and cursor change between frames, keep the rest of the scene synced
+    scene.render.use_persistent_data = True
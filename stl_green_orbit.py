@@ -1,12 +1,129 @@
 import bpy
 import os
 import sys
+import shutil
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tile_render
+
+# --- Configuration ---
+PERSISTENT_DATA = True  # Keep the synced scene between frames when only transforms animate (--no-persistent-data to compare)
+TRANSFORM_PATHS = {"location", "rotation_euler", "rotation_quaternion", "rotation_axis_angle", "scale",
+                   "delta_location", "delta_rotation_euler", "delta_rotation_quaternion", "delta_scale"}
+SIMULATION_MODIFIERS = {'CLOTH', 'SOFT_BODY', 'FLUID', 'DYNAMIC_PAINT', 'PARTICLE_SYSTEM', 'OCEAN', 'WAVE', 'EXPLODE'}
+NON_GEOMETRY_TYPES = {'CAMERA', 'LIGHT', 'LIGHT_PROBE', 'EMPTY', 'SPEAKER'}
+
+
+def animated_paths(id_data):
+    """Data paths of all F-Curves and drivers on id_data"""
+    anim_data = getattr(id_data, "animation_data", None)
+    if not anim_data:
+        return []
+    paths = [driver.data_path for driver in anim_data.drivers]
+    if anim_data.action:
+        try:
+            # Blender 4.4+ layered actions keep the F-Curves in a channelbag per slot
+            from bpy_extras import anim_utils
+            channelbag = anim_utils.action_get_channelbag_for_slot(anim_data.action, anim_data.action_slot)
+            fcurves = channelbag.fcurves if channelbag else []
+        except (ImportError, AttributeError):
+            fcurves = anim_data.action.fcurves
+        paths.extend(fcurve.data_path for fcurve in fcurves)
+    return paths
+
+
+def dynamic_geometry_reason(scene):
+    """Why geometry can change between frames, or None when only object transforms animate"""
+    for obj in scene.objects:
+        moving = [path for path in animated_paths(obj) if path not in TRANSFORM_PATHS]
+        if moving:
+            return f"{obj.name} animates {moving[0]}"
+        if obj.type in NON_GEOMETRY_TYPES:
+            continue
+        if animated_paths(obj.data) or animated_paths(getattr(obj.data, "shape_keys", None)):
+            return f"{obj.name} has animated {obj.type.lower()} data"
+        for modifier in obj.modifiers:
+            if modifier.type in SIMULATION_MODIFIERS:
+                return f"{obj.name} has a {modifier.type.lower()} modifier"
+            if modifier.type == 'NODES' and modifier.node_group and any(
+                    node.bl_idname == 'GeometryNodeInputSceneTime' for node in modifier.node_group.nodes):
+                return f"{obj.name} has time dependent geometry nodes"
+    return None
+
+
+def register_frame_timers(frame_times):
+    """Time each rendered frame, split into scene sync and sampling.
+
+    The first stats line mentioning samples marks the end of the sync (object
+    export, BVH build, shader compilation) for both Cycles and EEVEE.
+    """
+    current = {}
+
+    def on_render_pre(scene, *args):
+        current.clear()
+        current["frame"] = scene.frame_current
+        current["start"] = time.perf_counter()
+
+    def on_render_stats(stats, *args):
+        if "start" in current and "first_sample" not in current and "sample" in stats.lower():
+            current["first_sample"] = time.perf_counter()
+
+    def on_render_post(scene, *args):
+        if "start" not in current:
+            return
+        end = time.perf_counter()
+        first_sample = current.get("first_sample", current["start"])
+        frame_times.append((current["frame"], first_sample - current["start"], end - first_sample))
+        print(f"Frame {current['frame']}: sync {first_sample - current['start']:.2f}s, "
+              f"samples {end - first_sample:.2f}s")
+        current.clear()
+
+    bpy.app.handlers.render_pre.append(on_render_pre)
+    bpy.app.handlers.render_stats.append(on_render_stats)
+    bpy.app.handlers.render_post.append(on_render_post)
+
+
+def print_frame_times(frame_times):
+    if not frame_times:
+        return
+    # The first frame always pays the full sync, persistent data only helps the ones after it
+    first_frame, first_sync, first_samples = frame_times[0]
+    print(f"\nFirst frame ({first_frame}): sync {first_sync:.2f}s, samples {first_samples:.2f}s")
+    rest = frame_times[1:]
+    if rest:
+        sync = sum(t[1] for t in rest) / len(rest)
+        samples = sum(t[2] for t in rest) / len(rest)
+        share = sync / (sync + samples) if sync + samples > 0 else 0.0
+        print(f"Other frames, average: sync {sync:.2f}s, samples {samples:.2f}s ({share:.0%} of the frame time is sync)")
+
 
 # Get the path to the STL file from the command line arguments
 # The script expects the file path to be the first argument after '--'
 try:
     argv = sys.argv
     argv = argv[argv.index("--") + 1:]  # get all args after "--"
+    # --preview renders the four quarter turns to a contact sheet instead of the video
+    preview_only = "--preview" in argv
+    if preview_only:
+        argv.remove("--preview")
+
+    # --still F (repeatable) renders single frames split into parallel tiles, see tile_render.py
+    still_frames = []
+    while "--still" in argv:
+        idx = argv.index("--still")
+        still_frames.append(int(argv[idx + 1]))
+        del argv[idx:idx + 2]
+    persistent_data = PERSISTENT_DATA
+    if "--no-persistent-data" in argv:
+        argv.remove("--no-persistent-data")
+        persistent_data = False
+
+    still_tiles = None
+    if "--tiles" in argv:
+        idx = argv.index("--tiles")
+        still_tiles = argv[idx + 1]
+        del argv[idx:idx + 2]
     stl_filepath = argv[0]
 except IndexError:
     print("Error: Please provide a path to an STL file.")
@@ -53,10 +170,53 @@ bpy.context.scene.render.filepath = os.path.abspath(f"./{output_dir}/{stl_name}.
 bpy.context.scene.frame_start = 1
 bpy.context.scene.frame_end = 240
 
-# --- Render the animation ---
-print(f"Rendering animation for {stl_name}...")
-bpy.ops.render.render(animation=True)
-print("Rendering complete.")
+# Only the camera or turntable moves, so the imported mesh does not need to be synced
+# and its BVH rebuilt every frame. Only Cycles reads the persistent data setting.
+dynamic_reason = dynamic_geometry_reason(bpy.context.scene)
+if bpy.context.scene.render.engine != 'CYCLES':
+    print(f"Render engine is {bpy.context.scene.render.engine}, which has no persistent data: "
+          "the scene is synced again every frame")
+elif dynamic_reason:
+    print(f"Geometry changes between frames ({dynamic_reason}), leaving persistent data as the template sets it")
+else:
+    print(f"Geometry is static, persistent render data {'on' if persistent_data else 'off'}")
+    bpy.context.scene.render.use_persistent_data = persistent_data
+
+frame_times = []  # (frame, sync seconds, sample seconds)
+if not still_frames:
+    register_frame_timers(frame_times)
+
+if still_frames:
+    # --- Render hero frames as parallel tiles from a saved copy of the set up scene ---
+    still_dir = os.path.abspath(f"./{output_dir}/temp_{stl_name}")
+    os.makedirs(still_dir, exist_ok=True)
+    prepared_file = os.path.join(still_dir, "prepared.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=prepared_file, copy=True, compress=False)
+
+    columns, rows = tile_render.parse_tiles(still_tiles) if still_tiles else (None, None)
+    tile_render.render_tiled_frames(prepared_file, still_frames, os.path.abspath(output_dir), stl_name, columns, rows)
+    shutil.rmtree(still_dir, ignore_errors=True)
+elif preview_only:
+    # --- Render one low resolution still per quarter turn ---
+    scene = bpy.context.scene
+    preview_dir = os.path.abspath(f"./{output_dir}/preview_{stl_name}")
+    orbit_length = scene.frame_end - scene.frame_start + 1
+    preview_frames = [(f"{quarter * 90} degrees", scene.frame_start + quarter * orbit_length // 4)
+                      for quarter in range(4)]
+    image_paths = tile_render.render_preview_frames(scene, preview_frames, preview_dir)
+
+    print_frame_times(frame_times)
+
+    sheet_path = os.path.abspath(f"./{output_dir}/{stl_name}_preview.png")
+    tile_render.save_contact_sheet(image_paths, sheet_path, columns=2)
+    shutil.rmtree(preview_dir, ignore_errors=True)
+    print(f"Contact sheet saved to: {sheet_path}")
+else:
+    # --- Render the animation ---
+    print(f"Rendering animation for {stl_name}...")
+    bpy.ops.render.render(animation=True)
+    print("Rendering complete.")
+    print_frame_times(frame_times)
 
 # To prevent the script from saving the file, you can add this line at the end
 # to exit Blender without saving changes to the template.blend file.
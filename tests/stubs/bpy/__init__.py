@@ -0,0 +1,21 @@
+"""Minimal stand-in for Blender's bpy, enough to start typewrite_para.py in chunk mode.
+
+Rendering writes a placeholder file to the render filepath, like an FFMPEG render would.
+"""
+from types import SimpleNamespace
+
+from . import app
+
+
+def _render(animation=False, write_still=False):
+    with open(context.scene.render.filepath, "w") as f:
+        f.write(f"{context.scene.frame_start}-{context.scene.frame_end}")
+
+
+context = SimpleNamespace(scene=SimpleNamespace(
+    frame_start=1,
+    frame_end=1,
+    render=SimpleNamespace(filepath="", ffmpeg=SimpleNamespace(format="MPEG4")),
+))
+ops = SimpleNamespace(render=SimpleNamespace(render=_render))
+data = SimpleNamespace(filepath="")
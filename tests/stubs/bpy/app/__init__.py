@@ -0,0 +1,3 @@
+from . import handlers
+
+binary_path = "blender"
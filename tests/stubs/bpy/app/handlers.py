@@ -0,0 +1,5 @@
+frame_change_post = []
+
+
+def persistent(function):
+    return function
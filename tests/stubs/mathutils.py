@@ -0,0 +1,2 @@
+class Vector(tuple):
+    pass
@@ -0,0 +1,156 @@
+"""Farm queue tests with local directories, local worker processes and a fake Blender.
+
+The fake Blender only writes the chunk video the real one would, so claim, heartbeat,
+stale requeue and retry logic run exactly as on a cluster. The copied job script is
+started separately against a stub bpy (tests/stubs), to catch jobs it cannot run from.
+"""
+import json
+import multiprocessing
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import typewrite_para as tp  # noqa: E402
+
+STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+
+
+FAKE_BLENDER = """\
+#!{python}
+import os, sys, time
+args = sys.argv[sys.argv.index("--chunk-render") + 1:]
+start, end, chunk_id, safe = args[:4]
+with open({runs_file!r}, "a") as f:
+    f.write(chunk_id + "\\n")
+time.sleep({render_seconds})
+if {fail}:
+    sys.exit(1)
+out_dir = os.path.join("renders", "temp_" + safe)
+os.makedirs(out_dir, exist_ok=True)
+with open(os.path.join(out_dir, "chunk_" + chunk_id + ".mp4"), "w") as f:
+    f.write(start + "-" + end)
+"""
+
+
+@pytest.fixture
+def fast_farm(monkeypatch):
+    # Forked workers inherit the patched module
+    monkeypatch.setattr(tp, "FARM_HEARTBEAT_SECONDS", 0.1)
+    monkeypatch.setattr(tp, "FARM_POLL_SECONDS", 0.1)
+    monkeypatch.setattr(tp, "FARM_STALE_SECONDS", 1.0)
+
+
+def make_fake_blender(tmp_path, render_seconds=0.2, fail=False):
+    path = tmp_path / "fake_blender"
+    path.write_text(FAKE_BLENDER.format(python=sys.executable, runs_file=str(tmp_path / "runs.txt"),
+                                        render_seconds=render_seconds, fail=fail))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def make_job(tmp_path, num_frames, frames_per_task):
+    farm_dir = tmp_path / "farm"
+    farm_dir.mkdir()
+    blend_file = tmp_path / "prepared.blend"
+    blend_file.write_bytes(b"BLENDER")
+    chunks = tp.split_frames_fixed(num_frames, frames_per_task)
+    job_dir = tp.farm_create_job(str(farm_dir), str(blend_file), tp.__file__, "Hello", [],
+                                 "Hello", chunks)
+    return str(farm_dir), job_dir, chunks
+
+
+def start_workers(farm_dir, blender, count, idle_exit_seconds=2.0):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=tp.farm_worker_loop, args=(farm_dir, blender, idle_exit_seconds))
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def rendered_runs(tmp_path):
+    with open(tmp_path / "runs.txt") as f:
+        return [int(line) for line in f.read().split()]
+
+
+def test_local_workers_render_every_chunk_once(tmp_path, fast_farm):
+    # Renders take longer than the stale timeout, so only the heartbeat keeps the claims alive
+    blender = make_fake_blender(tmp_path, render_seconds=1.5)
+    farm_dir, job_dir, chunks = make_job(tmp_path, 100, 24)
+
+    workers = start_workers(farm_dir, blender, 3)
+    assert tp.farm_wait_for_job(job_dir, len(chunks))
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert sorted(rendered_runs(tmp_path)) == [chunk_id for _, _, chunk_id in chunks]
+    for start, end, chunk_id in chunks:
+        with open(tp.farm_chunk_video(job_dir, "Hello", chunk_id, ".mp4")) as f:
+            assert f.read() == f"{start}-{end}"
+    assert tp.farm_worker_count(job_dir) > 1
+
+
+def test_stale_claim_is_requeued(tmp_path, fast_farm):
+    blender = make_fake_blender(tmp_path)
+    farm_dir, job_dir, chunks = make_job(tmp_path, 48, 24)
+
+    # A worker that claimed a task and then died without ever sending a heartbeat
+    dead_job_dir, dead_claim = tp.farm_claim_task(farm_dir, "dead-worker")
+    assert dead_job_dir == job_dir
+
+    workers = start_workers(farm_dir, blender, 2, idle_exit_seconds=5.0)
+    assert tp.farm_wait_for_job(job_dir, len(chunks))
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert not os.path.exists(dead_claim)
+    assert sorted(rendered_runs(tmp_path)) == [chunk_id for _, _, chunk_id in chunks]
+    done_dir = tp.farm_task_dir(job_dir, "done")
+    for task_name in os.listdir(done_dir):
+        with open(os.path.join(done_dir, task_name)) as f:
+            assert json.load(f)["worker"] != "dead-worker"
+
+
+def test_failing_chunk_gives_up_after_max_attempts(tmp_path, fast_farm):
+    blender = make_fake_blender(tmp_path, render_seconds=0.0, fail=True)
+    farm_dir, job_dir, chunks = make_job(tmp_path, 10, 24)
+
+    workers = start_workers(farm_dir, blender, 1, idle_exit_seconds=1.0)
+    assert not tp.farm_wait_for_job(job_dir, len(chunks))
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert rendered_runs(tmp_path) == [0] * tp.FARM_MAX_ATTEMPTS
+    assert os.listdir(tp.farm_task_dir(job_dir, "failed")) == ["chunk_0000.json"]
+
+
+def run_job_script(job_dir, start, end, chunk_id):
+    """Start the job's copied script in chunk mode the way farm_run_task does, with a stub bpy"""
+    cmd = [sys.executable, os.path.join(job_dir, "typewrite_para.py"), "--", "Hello",
+           "--chunk-render", str(start), str(end), str(chunk_id), "Hello"]
+    env = dict(os.environ, PYTHONPATH=STUBS_DIR)
+    return subprocess.run(cmd, cwd=job_dir, env=env, capture_output=True, text=True)
+
+
+def test_job_script_runs_from_job_directory(tmp_path):
+    _, job_dir, chunks = make_job(tmp_path, 30, 24)
+
+    for start, end, chunk_id in chunks:
+        result = run_job_script(job_dir, start, end, chunk_id)
+        assert result.returncode == 0, result.stdout + result.stderr
+        with open(tp.farm_chunk_video(job_dir, "Hello", chunk_id, ".mp4")) as f:
+            assert f.read() == f"{start}-{end}"
+
+
+@pytest.mark.parametrize("module", tp.FARM_HELPER_MODULES)
+def test_job_script_needs_its_helper_modules(tmp_path, module):
+    _, job_dir, chunks = make_job(tmp_path, 10, 24)
+    os.remove(os.path.join(job_dir, module))
+
+    result = run_job_script(job_dir, *chunks[0])
+    assert result.returncode != 0
+    assert "ModuleNotFoundError" in result.stderr
@@ -0,0 +1,286 @@
+import bpy
+import os
+import sys
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+TILE_OVERLAP = 32  # Pixels each tile extends into its neighbours, blended away when stitching
+MAX_TILE_WORKERS = 16  # Maximum number of Blender instances rendering tiles at once
+PREVIEW_RESOLUTION_PERCENTAGE = 25  # Resolution of --preview stills
+PREVIEW_SAMPLES = 4  # Render samples of --preview stills
+
+# Usage (renders frames of a saved .blend as it is):
+#   blender -b scene.blend -P tile_render.py -- --frame 120 [--frame 200 ...] [--tiles 4x2] [--overlap 32]
+# typewrite_para.py and stl_green_orbit.py use this module for their --still option, so
+# the frames are rendered after their own setup. Its preview helpers (render_preview_frames,
+# save_contact_sheet) are shared by the other scripts as well.
+
+
+def parse_tiles(value):
+    """'4x2' -> (4, 2), '8' -> (8, 1)"""
+    columns, _, rows = value.lower().partition("x")
+    return int(columns), int(rows or 1)
+
+
+def default_tiles():
+    """One tile per two available cores, as close to square as possible"""
+    if hasattr(os, "sched_getaffinity"):
+        num_cpus = len(os.sched_getaffinity(0))
+    else:
+        num_cpus = os.cpu_count() or 1
+    num_tiles = max(1, min(MAX_TILE_WORKERS, num_cpus // 2))
+    rows = int(num_tiles ** 0.5)
+    while num_tiles % rows:
+        rows -= 1
+    return num_tiles // rows, rows
+
+
+def split_axis(size, count, overlap):
+    """Split 0..size into count core spans, each extended by overlap pixels where it has a neighbour.
+
+    Returns (start, end, extension before, extension after) per span, with end exclusive.
+    """
+    spans = []
+    for i in range(count):
+        core_start = size * i // count
+        core_end = size * (i + 1) // count
+        start = max(0, core_start - overlap)
+        end = min(size, core_end + overlap)
+        spans.append((start, end, core_start - start, end - core_end))
+    return spans
+
+
+def tile_layout(width, height, columns, rows, overlap):
+    """Pixel rectangles of all tiles, bottom-left origin like Blender's render border"""
+    # Keep the core of every tile at least twice the overlap wide so the blend ramps fit
+    overlap = min(overlap, width // (2 * columns), height // (2 * rows))
+    tiles = []
+    for y0, y1, bottom, top in split_axis(height, rows, overlap):
+        for x0, x1, left, right in split_axis(width, columns, overlap):
+            tiles.append({"x0": x0, "x1": x1, "y0": y0, "y1": y1,
+                          "left": left, "right": right, "bottom": bottom, "top": top})
+    return tiles
+
+
+def edge_weights(length, before, after):
+    """1D blend weights: ramps across the overlap shared with a neighbour, 1 elsewhere"""
+    import numpy as np  # Bundled with Blender's Python
+
+    weights = np.ones(length, dtype=np.float32)
+    positions = np.arange(length, dtype=np.float32) + 0.5
+    if before:
+        weights = np.minimum(weights, positions / (2 * before))
+    if after:
+        weights = np.minimum(weights, (length - positions) / (2 * after))
+    return weights
+
+
+def stitch_tiles(tiles, tile_paths, width, height, output_file):
+    """Blend the rendered tiles into one image, feathering every overlap so there are no seams"""
+    import numpy as np  # Bundled with Blender's Python
+
+    accumulated = np.zeros((height, width, 4), dtype=np.float32)
+    total_weight = np.zeros((height, width, 1), dtype=np.float32)
+
+    for tile, path in zip(tiles, tile_paths):
+        image = bpy.data.images.load(path)
+        tile_width, tile_height = image.size
+        pixels = np.empty(tile_width * tile_height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        bpy.data.images.remove(image)
+
+        # Guard against the render border rounding to a slightly different size
+        w = min(tile_width, tile["x1"] - tile["x0"])
+        h = min(tile_height, tile["y1"] - tile["y0"])
+        pixels = pixels.reshape(tile_height, tile_width, 4)[:h, :w]
+
+        weights = np.outer(edge_weights(h, tile["bottom"], tile["top"]),
+                           edge_weights(w, tile["left"], tile["right"]))[..., None]
+        y, x = tile["y0"], tile["x0"]
+        accumulated[y:y + h, x:x + w] += pixels * weights
+        total_weight[y:y + h, x:x + w] += weights
+
+    stitched = accumulated / np.maximum(total_weight, 1e-8)
+
+    image = bpy.data.images.new("stitched", width, height, alpha=True)
+    image.pixels.foreach_set(stitched.ravel())
+    image.filepath_raw = output_file
+    image.file_format = 'PNG'
+    image.save()
+    bpy.data.images.remove(image)
+
+
+def render_preview_frames(scene, frames, preview_dir):
+    """Render single low resolution stills of the given (label, frame) pairs in this process"""
+    scene.render.resolution_percentage = PREVIEW_RESOLUTION_PERCENTAGE
+    if scene.render.engine == 'CYCLES':
+        scene.cycles.samples = PREVIEW_SAMPLES
+    else:
+        scene.eevee.taa_render_samples = PREVIEW_SAMPLES
+    scene.render.image_settings.file_format = 'PNG'
+
+    os.makedirs(preview_dir, exist_ok=True)
+    image_paths = []
+    for label, frame in frames:
+        print(f"Preview frame {frame}: {label}")
+        scene.frame_set(frame)
+        scene.render.filepath = os.path.join(preview_dir, f"frame_{frame:04d}.png")
+        bpy.ops.render.render(write_still=True)
+        image_paths.append(scene.render.filepath)
+    return image_paths
+
+
+def save_contact_sheet(image_paths, sheet_path, columns):
+    """Tile rendered stills into one PNG, left to right and top to bottom"""
+    import numpy as np  # Bundled with Blender's Python
+
+    tiles = []
+    for path in image_paths:
+        image = bpy.data.images.load(path)
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        tiles.append(pixels.reshape(height, width, 4))
+        bpy.data.images.remove(image)
+
+    height, width = tiles[0].shape[:2]
+    rows = (len(tiles) + columns - 1) // columns
+    sheet = np.zeros((rows * height, columns * width, 4), dtype=np.float32)
+    sheet[..., 3] = 1.0
+    for i, tile in enumerate(tiles):
+        row, col = divmod(i, columns)
+        # Blender images start at the bottom left, so the first row goes on top
+        y = (rows - 1 - row) * height
+        sheet[y:y + height, col * width:(col + 1) * width] = tile
+
+    image = bpy.data.images.new("contact_sheet", columns * width, rows * height, alpha=True)
+    image.pixels.foreach_set(sheet.ravel())
+    image.filepath_raw = sheet_path
+    image.file_format = 'PNG'
+    image.save()
+    bpy.data.images.remove(image)
+
+
+def render_tiled_frames(blend_file, frames, output_dir, name, columns=None, rows=None, overlap=TILE_OVERLAP):
+    """Render each frame of blend_file as tiles in parallel Blender instances and stitch them.
+
+    blend_file must already be fully set up for rendering (frame handlers are not
+    run in the tile workers). Returns the list of stitched PNG files.
+    """
+    if columns is None or rows is None:
+        columns, rows = default_tiles()
+
+    scene = bpy.context.scene
+    width = scene.render.resolution_x * scene.render.resolution_percentage // 100
+    height = scene.render.resolution_y * scene.render.resolution_percentage // 100
+    tiles = tile_layout(width, height, columns, rows, overlap)
+
+    if hasattr(os, "sched_getaffinity"):
+        num_cpus = len(os.sched_getaffinity(0))
+    else:
+        num_cpus = os.cpu_count() or 1
+    num_workers = min(len(tiles), MAX_TILE_WORKERS)
+    threads = max(1, num_cpus // num_workers)
+
+    tile_dir = os.path.join(output_dir, f"tiles_{name}")
+    os.makedirs(tile_dir, exist_ok=True)
+    print(f"Rendering {len(frames)} frame(s) at {width}x{height} as {columns}x{rows} tiles "
+          f"({num_workers} instances, {threads} threads each)")
+
+    def render_tile(args):
+        frame, index, tile = args
+        tile_file = os.path.join(tile_dir, f"frame_{frame:04d}_tile_{index:03d}.png")
+        cmd = [
+            bpy.app.binary_path,
+            blend_file,
+            "--threads", str(threads),
+            "--background",
+            "--python", os.path.abspath(__file__),
+            "--",
+            "--tile-worker", str(frame),
+            f"{tile['x0'] / width}", f"{tile['x1'] / width}",
+            f"{tile['y0'] / height}", f"{tile['y1'] / height}",
+            tile_file
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not os.path.exists(tile_file):
+            return tile_file, result.stdout[-1000:] + result.stderr[-1000:]
+        return tile_file, None
+
+    output_files = []
+    for frame in frames:
+        jobs = [(frame, index, tile) for index, tile in enumerate(tiles)]
+        with ThreadPoolExecutor(max_workers=num_workers) as pool:
+            results = list(pool.map(render_tile, jobs))
+
+        errors = [(tile_file, error) for tile_file, error in results if error]
+        if errors:
+            for tile_file, error in errors:
+                print(f"ERROR rendering {tile_file}:\n{error}")
+            print(f"Skipping frame {frame}, tiles are preserved in: {tile_dir}")
+            continue
+
+        output_file = os.path.join(output_dir, f"{name}_frame_{frame:04d}.png")
+        stitch_tiles(tiles, [tile_file for tile_file, _ in results], width, height, output_file)
+        output_files.append(output_file)
+        print(f"Successfully created: {output_file}")
+
+    if len(output_files) == len(frames):
+        shutil.rmtree(tile_dir, ignore_errors=True)
+    return output_files
+
+
+def render_tile_worker(frame, min_x, max_x, min_y, max_y, tile_file):
+    """Render one border region of one frame to a PNG"""
+    scene = bpy.context.scene
+    scene.frame_set(frame)
+    scene.render.use_border = True
+    scene.render.use_crop_to_border = True
+    scene.render.border_min_x = min_x
+    scene.render.border_max_x = max_x
+    scene.render.border_min_y = min_y
+    scene.render.border_max_y = max_y
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.image_settings.color_mode = 'RGBA'
+    scene.render.image_settings.color_depth = '8'
+    scene.render.filepath = tile_file
+    bpy.ops.render.render(write_still=True)
+
+
+# --- Main Script ---
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    if "--tile-worker" in argv:
+        idx = argv.index("--tile-worker")
+        frame = int(argv[idx + 1])
+        min_x, max_x, min_y, max_y = (float(v) for v in argv[idx + 2:idx + 6])
+        render_tile_worker(frame, min_x, max_x, min_y, max_y, argv[idx + 6])
+    else:
+        frames = []
+        while "--frame" in argv:
+            idx = argv.index("--frame")
+            frames.append(int(argv[idx + 1]))
+            del argv[idx:idx + 2]
+        if not frames:
+            frames = [bpy.context.scene.frame_current]
+
+        columns = rows = None
+        if "--tiles" in argv:
+            idx = argv.index("--tiles")
+            columns, rows = parse_tiles(argv[idx + 1])
+
+        overlap = TILE_OVERLAP
+        if "--overlap" in argv:
+            overlap = int(argv[argv.index("--overlap") + 1])
+
+        if not bpy.data.filepath:
+            print("Error: Open a saved .blend file to render it in tiles.")
+            sys.exit(1)
+
+        name = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+        render_tiled_frames(bpy.data.filepath, frames, os.path.abspath("renders"), name, columns, rows, overlap)
+
+    bpy.ops.wm.quit_blender()
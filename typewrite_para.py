@@ -33,6 +33,10 @@ import subprocess
 import multiprocessing
 from pathlib import Path
 import time
+import json
+import shutil
+import socket
+from concurrent.futures import ThreadPoolExecutor
 
 # Try to import Blender-specific modules
 try:
@@ -54,8 +58,34 @@ POST_ANIMATION_FRAMES = 48
 CURSOR_OFFSET_X = -.14  # Offset for the cursor position
 CURSOR_OFFSET_Y = 0.29  # Offset for the cursor position
 TEXT_MARGIN_FACTOR = 1.2  # How much extra space to leave around text (1.2 = 20% extra)
+RENDER_ENGINE = "auto"  # "eevee", "cycles" or "auto" (Cycles on the CPU when there is no GPU)
 PARALLEL_FRAME_THRESHOLD = 30  # If total frames exceed this, use parallel rendering
-MAX_PARALLEL_PROCESSES = 4  # Maximum number of parallel Blender instances
+MAX_PARALLEL_PROCESSES = 16  # Maximum number of parallel Blender instances
+DEFAULT_PARALLEL_PROCESSES = 4  # Parallel instances before any scaling has been measured
+MIN_THREADS_PER_WORKER = 2  # Never give a parallel instance fewer threads than this
+MEMORY_RESERVE_MB = 1024  # Memory to leave free when admitting another parallel instance
+MEMORY_PROBE_FRAMES = 2  # Frames the first instance renders before its memory use is trusted
+MEMORY_POLL_SECONDS = 1  # How often parallel instances are checked
+FARM_FRAMES_PER_TASK = 24  # Frames per task when sharding across machines (--farm)
+FARM_HEARTBEAT_SECONDS = 5  # How often a farm worker touches its claim
+FARM_STALE_SECONDS = 120  # Requeue a claim whose heartbeat stopped for this long
+FARM_POLL_SECONDS = 2  # How often workers and the coordinator check the queue
+FARM_MAX_ATTEMPTS = 3  # Give up on a chunk after this many failed renders
+TIMINGS_DB_PATH = os.path.join(os.path.expanduser("~"), ".efr-bapveo", "render_timings.json")  # History for --plan
+TIMINGS_HISTORY_LENGTH = 20  # Completed jobs kept per template and quality
+COMPOSITE_MAX_PARALLEL = 4  # Backgrounds composited at the same time (--over)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".exr", ".webp", ".bmp")
+MAX_TOTAL_FRAMES = None  # Cap the video length in frames by typing faster (also: --max-frames N)
+MAX_TOTAL_SECONDS = None  # Cap the video length in seconds by typing faster (also: --max-seconds S)
+VERIFY_OUTPUT = True  # Check rendered frames with numpy after every job (disable with --no-verify)
+QA_FRAME_WIDTH = 320  # Frames are scaled down to this width for the checks
+QA_PIXEL_THRESHOLD = 24  # Gray level difference that counts a pixel as changed
+QA_BLACK_LEVEL = 16  # A frame whose brightest pixel is below this is black
+QA_DISCONTINUITY_PIXELS = 200  # Changed pixels across a chunk seam that count as a jump
+QA_RERENDER_ATTEMPTS = 1  # How many times a chunk that fails verification is rendered again
+USE_GLYPH_MESHES = False  # Pre-tessellate the text into per-character meshes once (also: --glyph-mesh)
+WINDOW_LINES = 0  # If > 0, only lay out this many lines and scroll the camera (also: --window-lines N)
+WINDOW_SCROLL_FRAMES = 8  # How many frames the camera takes to scroll down one line
 
 # --- Handler Function ---
 @persistent
@@ -90,7 +120,21 @@ def typewriter_handler(scene, depsgraph):
     if scene.frame_current % 30 == 0:
         print(f"Frame {scene.frame_current}: showing {chars_to_show}/{len(full_text)} chars")
     
-    if text_obj.data.body != visible_text:
+    # In glyph mesh mode the reveal is done by geometry nodes, so the body is never rewritten
+    glyph_mode = "glyph_cursor_x" in text_obj.data
+
+    # In window mode only the last lines are laid out, and the text object is moved
+    # so those lines stay where they would be in the full document
+    window_lines = text_obj.data.get("window_lines", 0)
+    if window_lines and not glyph_mode:
+        lines = visible_text.split('\n')
+        first_line = max(0, len(lines) - 1 - window_lines)
+        visible_text = '\n'.join(lines[first_line:])
+        origin = text_obj.data["window_origin"]
+        line_step = text_obj.data["window_line_step"]
+        text_obj.location = [origin[i] + line_step[i] * first_line for i in range(3)]
+
+    if not glyph_mode and text_obj.data.body != visible_text:
         text_obj.data.body = visible_text
 
     # --- 2. Cursor Logic (Blinking and Movement) ---
@@ -98,7 +142,11 @@ def typewriter_handler(scene, depsgraph):
     
     if cursor_obj:
         # Calculate cursor position based on current text
-        cursor_x, cursor_y = calculate_cursor_position(text_obj, visible_text)
+        if glyph_mode:
+            cursor_x = text_obj.data["glyph_cursor_x"][chars_to_show]
+            cursor_y = text_obj.data["glyph_cursor_y"][chars_to_show]
+        else:
+            cursor_x, cursor_y = calculate_cursor_position(text_obj, visible_text)
         
         # Get the cursor's own width from its bounding box
         cursor_width = cursor_obj.dimensions.x
@@ -251,9 +299,1189 @@ def calculate_and_set_camera_position(text_object, cursor_object, camera_object,
     print(f"Camera rotation: {camera_object.rotation_euler}")
     print(f"Text dimensions: {text_object.dimensions.x:.2f} x {text_object.dimensions.y:.2f} x {text_object.dimensions.z:.2f}")
 
+def pop_option(args, flag, num_values=0):
+    """Remove a --flag (and the values that follow it) from args.
+
+    Returns None if the flag is not present, True for a flag without values,
+    otherwise the list of values.
+    """
+    if flag not in args:
+        return None
+    idx = args.index(flag)
+    values = args[idx + 1:idx + 1 + num_values]
+    if len(values) != num_values:
+        print(f"Error: {flag} expects {num_values} value(s)")
+        sys.exit(1)
+    del args[idx:idx + 1 + num_values]
+    return values if num_values else True
+
+def measure_glyph_boxes(text_obj, body, outlines=None):
+    """Lay out `body` once and return the local 2D bounding box of every spline, in text order.
+
+    If `outlines` is a list, the flattened 2D outline of every spline is appended to it.
+    """
+    text_obj.data.body = body
+    bpy.context.view_layer.update()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    eval_obj = text_obj.evaluated_get(depsgraph)
+    
+    boxes = []
+    curve = eval_obj.to_curve(depsgraph)
+    try:
+        for spline in curve.splines:
+            points = [p.co for p in spline.bezier_points] or [p.co for p in spline.points]
+            if not points:
+                continue
+            xs = [co[0] for co in points]
+            ys = [co[1] for co in points]
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+            if outlines is not None:
+                outlines.append(spline_outline(spline, text_obj.data.resolution_u))
+    finally:
+        eval_obj.to_curve_clear()
+    return boxes
+
+def spline_outline(spline, resolution):
+    """Flatten a closed spline into a list of (x, y) points"""
+    from mathutils.geometry import interpolate_bezier
+    
+    if not spline.bezier_points:
+        return [(p.co[0], p.co[1]) for p in spline.points]
+    
+    points = spline.bezier_points
+    outline = []
+    for i in range(len(points)):
+        p0, p1 = points[i], points[(i + 1) % len(points)]
+        segment = interpolate_bezier(p0.co, p0.handle_right, p1.handle_left, p1.co, resolution + 1)
+        outline.extend((co[0], co[1]) for co in segment[:-1])
+    return outline
+
+def point_in_outlines(x, y, outlines):
+    """Even-odd test against all outlines of a glyph, so counters like the hole in "o" are outside"""
+    inside = False
+    for outline in outlines:
+        xj, yj = outline[-1]
+        for xi, yi in outline:
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            xj, yj = xi, yi
+    return inside
+
+def distance_to_outlines(x, y, outlines):
+    """Distance from (x, y) to the nearest edge of any outline"""
+    best = float("inf")
+    for outline in outlines:
+        xj, yj = outline[-1]
+        for xi, yi in outline:
+            dx, dy = xi - xj, yi - yj
+            length_sq = dx * dx + dy * dy
+            t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((x - xj) * dx + (y - yj) * dy) / length_sq))
+            ex, ey = xj + t * dx - x, yj + t * dy - y
+            best = min(best, ex * ex + ey * ey)
+            xj, yj = xi, yi
+    return best ** 0.5
+
+def build_glyph_mesh(text_obj):
+    """Convert the full text into one mesh whose faces carry a per-character index.
+
+    The font is laid out and tessellated once here. A geometry nodes modifier then
+    deletes every face whose `char_index` is >= the animated `char_count`, so the
+    reveal costs the same per frame no matter how long the text is.
+    Returns the new mesh object, or None if the glyphs could not be mapped.
+    """
+    font_data = text_obj.data
+    full_text = font_data["full_text"]
+    original_text = font_data.body
+    
+    try:
+        # Blender emits the splines of each character in order, so measure how many
+        # splines every distinct character produces to split the full layout per character
+        splines_per_char = {}
+        for ch in set(full_text):
+            splines_per_char[ch] = 0 if ch.isspace() else len(measure_glyph_boxes(text_obj, ch))
+        
+        # Width of a space, which has no geometry of its own
+        space_advance = (measure_glyph_boxes(text_obj, "i i")[-1][2]
+                         - measure_glyph_boxes(text_obj, "ii")[-1][2])
+        
+        spline_outlines = []
+        spline_boxes = measure_glyph_boxes(text_obj, full_text, spline_outlines)
+        
+        font_data.body = full_text
+        bpy.context.view_layer.update()
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        mesh = bpy.data.meshes.new_from_object(text_obj.evaluated_get(depsgraph))
+    finally:
+        font_data.body = original_text
+    
+    if sum(splines_per_char[ch] for ch in full_text) != len(spline_boxes):
+        print("Warning: Could not map text splines to characters (text box overflow?). "
+              "Falling back to per-frame text layout.")
+        bpy.data.meshes.remove(mesh)
+        return None
+    
+    # Merge the spline boxes of each character into one glyph box, and keep its outlines
+    glyph_boxes = {}
+    glyph_outlines = {}
+    spline_idx = 0
+    for char_idx, ch in enumerate(full_text):
+        count = splines_per_char[ch]
+        if count:
+            boxes = spline_boxes[spline_idx:spline_idx + count]
+            glyph_boxes[char_idx] = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                                     max(b[2] for b in boxes), max(b[3] for b in boxes))
+            glyph_outlines[char_idx] = spline_outlines[spline_idx:spline_idx + count]
+        spline_idx += count
+    
+    # Bucket the glyph boxes into a grid so each face only tests its neighbours
+    cell_size = max(font_data.size, 1e-4)
+    grid = {}
+    for char_idx, (x0, y0, x1, y1) in glyph_boxes.items():
+        for gx in range(int(x0 // cell_size), int(x1 // cell_size) + 1):
+            for gy in range(int(y0 // cell_size), int(y1 // cell_size) + 1):
+                grid.setdefault((gx, gy), []).append(char_idx)
+    
+    # Bevel and extrusion grow the outline slightly past the spline control points
+    margin = font_data.bevel_depth + font_data.offset + font_data.extrude + 1e-4
+    
+    centers = [0.0] * (len(mesh.polygons) * 3)
+    mesh.polygons.foreach_get("center", centers)
+    face_chars = []
+    overlapping_faces = 0  # Inside the boxes of several glyphs, e.g. kerned pairs like "AV"
+    ambiguous_faces = 0  # Inside the outlines of several glyphs
+    for i in range(len(mesh.polygons)):
+        x, y = centers[i * 3], centers[i * 3 + 1]
+        candidates = [char_idx for char_idx in grid.get((int(x // cell_size), int(y // cell_size)), ())
+                      if glyph_boxes[char_idx][0] - margin <= x <= glyph_boxes[char_idx][2] + margin
+                      and glyph_boxes[char_idx][1] - margin <= y <= glyph_boxes[char_idx][3] + margin]
+        if len(candidates) == 1:
+            face_chars.append(candidates[0])
+            continue
+        if candidates:
+            overlapping_faces += 1
+        else:
+            candidates = list(glyph_boxes.keys())
+        
+        # Signed distance to the real glyph outline: deepest inside wins, otherwise the
+        # nearest outline (side and bevel faces sit on or just outside it)
+        best_idx = None
+        best_score = None
+        inside_count = 0
+        for char_idx in candidates:
+            distance = distance_to_outlines(x, y, glyph_outlines[char_idx])
+            if point_in_outlines(x, y, glyph_outlines[char_idx]):
+                distance = -distance
+                inside_count += 1
+            if best_score is None or distance < best_score:
+                best_idx, best_score = char_idx, distance
+        if inside_count > 1:
+            ambiguous_faces += 1
+        face_chars.append(best_idx if best_idx is not None else len(full_text))
+    
+    char_attr = mesh.attributes.new(name="char_index", type='INT', domain='FACE')
+    char_attr.data.foreach_set("value", face_chars)
+    
+    if not mesh.materials:
+        for material in font_data.materials:
+            mesh.materials.append(material)
+    
+    glyph_obj = bpy.data.objects.new(f"{text_obj.name}_glyphs", mesh)
+    for collection in text_obj.users_collection:
+        collection.objects.link(glyph_obj)
+    glyph_obj.parent = text_obj.parent
+    glyph_obj.matrix_parent_inverse = text_obj.matrix_parent_inverse.copy()
+    glyph_obj.matrix_basis = text_obj.matrix_basis.copy()
+    
+    # --- Geometry nodes: delete faces of characters that are not typed yet ---
+    group = bpy.data.node_groups.new("TypewriterReveal", 'GeometryNodeTree')
+    group.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    count_socket = group.interface.new_socket(name="Char Count", in_out='INPUT', socket_type='NodeSocketInt')
+    group.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    
+    group_in = group.nodes.new('NodeGroupInput')
+    group_out = group.nodes.new('NodeGroupOutput')
+    char_index = group.nodes.new('GeometryNodeInputNamedAttribute')
+    char_index.data_type = 'INT'
+    char_index.inputs["Name"].default_value = "char_index"
+    compare = group.nodes.new('FunctionNodeCompare')
+    compare.data_type = 'INT'
+    compare.operation = 'GREATER_EQUAL'
+    delete = group.nodes.new('GeometryNodeDeleteGeometry')
+    delete.domain = 'FACE'
+    
+    group.links.new(char_index.outputs["Attribute"], compare.inputs[2])
+    group.links.new(group_in.outputs["Char Count"], compare.inputs[3])
+    group.links.new(group_in.outputs["Geometry"], delete.inputs["Geometry"])
+    group.links.new(compare.outputs["Result"], delete.inputs["Selection"])
+    group.links.new(delete.outputs["Geometry"], group_out.inputs["Geometry"])
+    
+    modifier = glyph_obj.modifiers.new(name="TypewriterReveal", type='NODES')
+    modifier.node_group = group
+    
+    # Drive the threshold from the same char_count keyframes the handler reads
+    fcurve = modifier.driver_add(f'["{count_socket.identifier}"]')
+    driver = fcurve.driver
+    driver.type = 'SCRIPTED'
+    driver.expression = "char_count"
+    var = driver.variables.new()
+    var.name = "char_count"
+    var.type = 'SINGLE_PROP'
+    var.targets[0].id_type = 'OBJECT'
+    var.targets[0].id = text_obj
+    var.targets[0].data_path = 'data["char_count"]'
+    
+    # --- Cursor lookup table, one entry per number of typed characters ---
+    line_height = font_data.size * font_data.space_line
+    scale_x = text_obj.scale.x
+    scale_y = text_obj.scale.y
+    cursor_x = [text_obj.location.x]
+    cursor_y = [text_obj.location.y]
+    line_index = 0
+    line_end_x = None  # Right edge of the last glyph on the current line (local space)
+    trailing_spaces = 0
+    for char_idx, ch in enumerate(full_text):
+        if ch == "\n":
+            line_index += 1
+            line_end_x = None
+            trailing_spaces = 0
+        elif char_idx in glyph_boxes:
+            line_end_x = glyph_boxes[char_idx][2]
+            trailing_spaces = 0
+        else:
+            trailing_spaces += 1
+        
+        local_x = (line_end_x if line_end_x is not None else 0.0) + trailing_spaces * space_advance
+        cursor_x.append(text_obj.location.x + local_x * scale_x)
+        cursor_y.append(text_obj.location.y - line_index * line_height * scale_y)
+    
+    font_data["glyph_cursor_x"] = cursor_x
+    font_data["glyph_cursor_y"] = cursor_y
+    
+    # The original text object only feeds the handler from now on
+    text_obj.hide_set(True)
+    text_obj.hide_render = True
+    
+    print(f"Glyph mesh mode: {len(glyph_boxes)} glyphs, {len(mesh.polygons)} faces")
+    if overlapping_faces:
+        print(f"  {overlapping_faces} faces in overlapping glyph boxes were matched by outline, "
+              f"{ambiguous_faces} of them lie inside more than one outline")
+    return glyph_obj
+
+def concat_chunk_videos(chunk_videos, concat_file, output_file):
+    """Join chunk videos into output_file with ffmpeg's concat demuxer. Returns True on success"""
+    with open(concat_file, 'w') as f:
+        for chunk_video in chunk_videos:
+            f.write(f"file '{chunk_video}'\n")
+    
+    ffmpeg_cmd = [
+        "ffmpeg",
+        "-f", "concat",
+        "-safe", "0",
+        "-i", concat_file,
+        "-c", "copy",
+        "-y",  # Overwrite output
+        output_file
+    ]
+    
+    try:
+        subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
+        print(f"Successfully created: {output_file}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error combining videos with ffmpeg: {e}")
+        print(f"ffmpeg output: {e.stderr}")
+    except FileNotFoundError:
+        print("ERROR: ffmpeg not found. Please install ffmpeg to combine video chunks.")
+    return False
+
+def fit_frame_budget(pre_frames, typing_frames, post_frames, max_frames):
+    """Shrink the pre-roll, typing and hold phases proportionally to fit max_frames in total.
+
+    Frame 1 comes before the pre-roll, so the phases share max_frames - 1 frames.
+    Typing keeps at least one frame, and the char_count keyframes spread the
+    characters over it, so the rate becomes fractional characters per frame.
+    """
+    available = max(1, max_frames - 1)
+    natural = pre_frames + typing_frames + post_frames
+    if natural <= available:
+        return pre_frames, typing_frames, post_frames
+    
+    scale = available / natural
+    pre_frames = int(pre_frames * scale)
+    post_frames = int(post_frames * scale)
+    typing_frames = max(1, available - pre_frames - post_frames)
+    return pre_frames, typing_frames, post_frames
+
+def split_frames_even(total_frames, num_chunks):
+    """Split frames 1..total_frames into num_chunks (start, end, chunk_id) ranges"""
+    frames_per_chunk = total_frames // num_chunks
+    chunks = []
+    for i in range(num_chunks):
+        start = 1 + (i * frames_per_chunk)
+        if i == num_chunks - 1:
+            # Last chunk gets any remaining frames
+            end = total_frames
+        else:
+            end = start + frames_per_chunk - 1
+        chunks.append((start, end, i))
+    return chunks
+
+def split_frames_fixed(total_frames, frames_per_chunk):
+    """Split frames 1..total_frames into (start, end, chunk_id) ranges of frames_per_chunk"""
+    chunks = []
+    for chunk_id, start in enumerate(range(1, total_frames + 1, frames_per_chunk)):
+        chunks.append((start, min(start + frames_per_chunk - 1, total_frames), chunk_id))
+    return chunks
+
+# --- Output QA ---
+def expected_frame_changes(text_object, cursor_object, camera_object, total_frames):
+    """Return (changes, visible) lists indexed by frame.
+
+    changes[f] is True when frame f should look different from frame f - 1, based on
+    the char_count keyframes (only characters that draw something, or any character
+    while the cursor is visible), cursor blinks and camera animation. visible[f] is
+    True when typed text or the cursor should be on screen at frame f.
+    """
+    full_text = text_object.data["full_text"]
+    char_curve = find_fcurve(text_object.data, '["char_count"]')
+    camera_curves = []
+    if camera_object and camera_object.animation_data:
+        for data_path in ("location", "rotation_euler"):
+            for index in range(3):
+                fcurve = find_fcurve(camera_object, data_path, index)
+                if fcurve:
+                    camera_curves.append(fcurve)
+    
+    def cursor_visible(frame):
+        return cursor_object is not None and (frame // BLINK_SPEED_FRAMES) % 2 == 0
+    
+    changes = [False] * (total_frames + 1)
+    visible = [False] * (total_frames + 1)
+    previous_count = int(char_curve.evaluate(1)) if char_curve else 0
+    visible[1] = bool(full_text[:previous_count].strip()) or cursor_visible(1)
+    for frame in range(2, total_frames + 1):
+        count = int(char_curve.evaluate(frame)) if char_curve else 0
+        visible[frame] = bool(full_text[:count].strip()) or cursor_visible(frame)
+        typed = full_text[min(previous_count, count):max(previous_count, count)]
+        text_changed = bool(typed.strip()) or (typed and (cursor_visible(frame) or cursor_visible(frame - 1)))
+        blinked = cursor_object is not None and cursor_visible(frame) != cursor_visible(frame - 1)
+        camera_moved = any(abs(c.evaluate(frame) - c.evaluate(frame - 1)) > 1e-6 for c in camera_curves)
+        changes[frame] = bool(text_changed or blinked or camera_moved)
+        previous_count = count
+    return changes, visible
+
+def iter_video_frames(video_file, width, height):
+    """Yield the frames of a video as small grayscale numpy arrays, streamed from ffmpeg"""
+    import numpy as np  # Bundled with Blender's Python
+    
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-i", video_file,
+        "-vf", f"scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "gray",
+        "-"
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    frame_size = width * height
+    try:
+        while True:
+            data = process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            yield np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+def changed_pixels(frame_a, frame_b):
+    import numpy as np  # Bundled with Blender's Python
+    difference = np.abs(frame_a.astype(np.int16) - frame_b.astype(np.int16))
+    return int(np.count_nonzero(difference > QA_PIXEL_THRESHOLD))
+
+def verify_chunk(video_file, start, end, expected_changes, width, height, check_black=True):
+    """Check one rendered range: frame count, black frames and frames that should have changed.
+
+    Errors mean the range should be rendered again, warnings are only reported. Black
+    frames are only collected here, verify_chunks decides whether they are expected.
+    """
+    result = {"file": video_file, "start": start, "end": end, "frames_expected": end - start + 1,
+              "frames_found": 0, "black_frames": [], "errors": [], "warnings": []}
+    if not os.path.exists(video_file):
+        result["errors"].append("output file is missing")
+        return result
+    
+    previous = None
+    for frame_offset, pixels in enumerate(iter_video_frames(video_file, width, height)):
+        frame = start + frame_offset
+        result["frames_found"] += 1
+        if frame_offset == 0:
+            result["first_pixels"] = pixels
+        
+        if check_black and int(pixels.max()) < QA_BLACK_LEVEL:
+            result["black_frames"].append(frame)
+        if previous is not None and frame <= end and expected_changes[frame] and changed_pixels(previous, pixels) == 0:
+            result["warnings"].append(f"frame {frame} is identical to frame {frame - 1}")
+        previous = pixels
+    result["last_pixels"] = previous
+    
+    if result["frames_found"] != result["frames_expected"]:
+        result["errors"].append(f"{result['frames_found']} frames, expected {result['frames_expected']}")
+    return result
+
+def verify_chunks(chunk_videos, chunks, expected_changes, expected_visible, scene):
+    """Verify every chunk and the seams between them. Returns {chunk_id: result}, or None without ffmpeg"""
+    if shutil.which("ffmpeg") is None:
+        print("Warning: ffmpeg not found, skipping output verification")
+        return None
+    
+    aspect = scene.render.resolution_y / scene.render.resolution_x
+    width = QA_FRAME_WIDTH
+    height = max(2, int(QA_FRAME_WIDTH * aspect) // 2 * 2)
+    # A transparent caption is legitimately black while nothing is typed and the cursor is off
+    check_black = not scene.render.film_transparent
+    
+    print("\nVerifying rendered frames...")
+    results = {}
+    for video_file, (start, end, chunk_id) in zip(chunk_videos, chunks):
+        results[chunk_id] = verify_chunk(video_file, start, end, expected_changes, width, height, check_black)
+    
+    # On a dark template the frames before anything is typed are black too, so a black
+    # frame only counts when the first frame is not black or something should be visible
+    template_black = any(1 in result["black_frames"] for result in results.values())
+    for result in results.values():
+        for frame in result["black_frames"]:
+            if not template_black or (frame <= result["end"] and expected_visible[frame]):
+                result["errors"].append(f"frame {frame} is black")
+    
+    # A jump between the last frame of a chunk and the first of the next where nothing
+    # should change means the chunks were not rendered from the same scene state
+    for (_, _, chunk_id), (next_start, _, next_id) in zip(chunks, chunks[1:]):
+        last = results[chunk_id].get("last_pixels")
+        first = results[next_id].get("first_pixels")
+        if last is None or first is None:
+            continue
+        changed = changed_pixels(last, first)
+        if changed >= QA_DISCONTINUITY_PIXELS and not expected_changes[next_start]:
+            message = f"discontinuity between frames {next_start - 1} and {next_start}"
+            results[chunk_id]["errors"].append(message)
+            results[next_id]["errors"].append(message)
+    
+    for chunk_id, result in results.items():
+        result.pop("first_pixels", None)
+        result.pop("last_pixels", None)
+        status = "OK" if not result["errors"] else "FAILED"
+        print(f"  Chunk {chunk_id} ({result['start']}-{result['end']}): {status}, "
+              f"{result['frames_found']}/{result['frames_expected']} frames")
+        for message in result["errors"]:
+            print(f"    ERROR: {message}")
+        for message in result["warnings"][:5]:
+            print(f"    Warning: {message}")
+        if len(result["warnings"]) > 5:
+            print(f"    ... {len(result['warnings']) - 5} more warnings")
+    return results
+
+def write_job_report(report_file, report):
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Job report saved to: {report_file}")
+
+# --- Render Timing History ---
+def load_timings():
+    try:
+        with open(TIMINGS_DB_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def timing_history(template, quality, mode):
+    """Past jobs of one render mode ("single", "parallel" or "farm") for this template and quality"""
+    return [job for job in load_timings().get(f"{template}|{quality}", []) if job.get("mode") == mode]
+
+def record_timing(template, quality, mode, frames, workers, seconds, peak_rss_mb=None):
+    """Add a completed job to the timing history used by --plan and the worker tuning.
+
+    seconds should cover rendering only, workers is the number of local instances
+    for parallel jobs and the number of machines for farm jobs.
+    """
+    timings = load_timings()
+    history = timings.setdefault(f"{template}|{quality}", [])
+    job = {
+        "mode": mode,
+        "frames": frames,
+        "workers": workers,
+        "seconds": round(seconds, 2),
+        "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if peak_rss_mb:
+        job["peak_rss_mb"] = round(peak_rss_mb)
+    history.append(job)
+    del history[:-TIMINGS_HISTORY_LENGTH]
+    
+    try:
+        os.makedirs(os.path.dirname(TIMINGS_DB_PATH), exist_ok=True)
+        tmp_path = TIMINGS_DB_PATH + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(timings, f, indent=2)
+        os.replace(tmp_path, TIMINGS_DB_PATH)
+    except OSError as e:
+        print(f"Warning: Could not update timing history {TIMINGS_DB_PATH}: {e}")
+
+def estimate_render_seconds(template, quality, mode, frames, workers):
+    """Estimate wall time from the median worker-seconds per frame of past jobs.
+
+    Uses the history of the same render mode for this template and quality, falling
+    back to any template rendered at the same quality in that mode.
+    Returns (seconds, number_of_jobs) or (None, 0).
+    """
+    history = timing_history(template, quality, mode)
+    if not history:
+        history = [job for key, jobs in load_timings().items() if key.endswith(f"|{quality}")
+                   for job in jobs if job.get("mode") == mode]
+    if not history:
+        return None, 0
+    
+    costs = sorted(job["seconds"] * job["workers"] / job["frames"] for job in history if job["frames"] > 0)
+    if not costs:
+        return None, 0
+    frame_cost = costs[len(costs) // 2]
+    return frame_cost * frames / max(workers, 1), len(costs)
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+def print_render_plan(template, quality, animation_start_frame, animation_end_frame, total_frames, mode, chunks):
+    """Print what a render would do without rendering anything"""
+    print(f"\n=== RENDER PLAN ===")
+    print(f"Template: {template}")
+    print(f"Quality: {quality}")
+    print(f"Frames: 1-{total_frames} ({total_frames} frames)")
+    print(f"  Pre-roll: 1-{animation_start_frame - 1}")
+    print(f"  Typing:   {animation_start_frame}-{animation_end_frame}")
+    print(f"  Hold:     {animation_end_frame + 1}-{total_frames}")
+    
+    print(f"Mode: {mode}")
+    for start, end, chunk_id in chunks:
+        print(f"  Chunk {chunk_id}: Frames {start}-{end}")
+    
+    workers = len(chunks) if mode == "parallel" else 1
+    seconds, num_jobs = estimate_render_seconds(template, quality, mode, total_frames, workers)
+    if seconds is None:
+        print("Estimate: no timing history yet, run one job to calibrate")
+    elif mode == "farm":
+        print(f"Estimate: {format_duration(seconds)} on one farm worker, divided by the number of workers "
+              f"(from {num_jobs} previous job(s))")
+    else:
+        print(f"Estimate: {format_duration(seconds)} (from {num_jobs} previous job(s))")
+
+# --- Windowed Lines ---
+def find_fcurve(id_data, data_path, index=0):
+    """Return the F-Curve animating data_path[index] on id_data, or None"""
+    anim_data = id_data.animation_data
+    if not anim_data or not anim_data.action:
+        return None
+    try:
+        # Blender 4.4+ keeps the F-Curves of layered actions per slot
+        from bpy_extras import anim_utils
+        channelbag = anim_utils.action_get_channelbag_for_slot(anim_data.action, anim_data.action_slot)
+        if channelbag:
+            return channelbag.fcurves.find(data_path, index=index)
+    except (ImportError, AttributeError):
+        pass
+    return anim_data.action.fcurves.find(data_path, index=index)
+
+def first_frame_with_count(fcurve, count, first, last):
+    """Binary search for the first frame in [first, last] where the animated char_count reaches count"""
+    while first < last:
+        middle = (first + last) // 2
+        if int(fcurve.evaluate(middle)) >= count:
+            last = middle
+        else:
+            first = middle + 1
+    return first
+
+def measure_line_step(text_obj):
+    """Local Y offset from one line of text to the next, measured from the font layout"""
+    original_text = text_obj.data.body
+    try:
+        splines_per_line = len(measure_glyph_boxes(text_obj, "A"))
+        boxes = measure_glyph_boxes(text_obj, "A\nA")
+        return boxes[splines_per_line][1] - boxes[0][1]
+    finally:
+        text_obj.data.body = original_text
+
+def frame_camera_on_window(text_object, cursor_object, camera_object, scene, window_lines):
+    """Frame the camera on window_lines copies of the longest line instead of the full text"""
+    full_text = text_object.data["full_text"]
+    lines = full_text.split('\n')
+    longest_line = max(lines, key=len)
+    
+    text_object.data["full_text"] = '\n'.join([longest_line] * min(window_lines, len(lines)))
+    try:
+        calculate_and_set_camera_position(text_object, cursor_object, camera_object, scene)
+    finally:
+        text_object.data["full_text"] = full_text
+
+def setup_window_scroll(text_object, camera_object, window_lines, animation_start_frame, animation_end_frame):
+    """Store the window settings for the handler and keyframe the camera scroll path.
+
+    The handler only lays out the last window_lines + 1 lines and moves the text
+    object so every line stays where it would be in the full document. The camera
+    scrolls down one line each time a line past the window starts.
+    """
+    font_data = text_object.data
+    full_text = font_data["full_text"]
+    line_step = measure_line_step(text_object)
+    
+    font_data["window_lines"] = window_lines
+    font_data["window_origin"] = list(text_object.location)
+    # Follows the text object's rotation and scale, in the text's parent space
+    font_data["window_line_step"] = list(text_object.matrix_basis.to_3x3() @ Vector((0.0, line_step, 0.0)))
+    
+    lines = full_text.split('\n')
+    if not camera_object or len(lines) <= window_lines:
+        return
+    
+    camera_step = text_object.matrix_world.to_3x3() @ Vector((0.0, line_step, 0.0))
+    if camera_object.parent:
+        camera_step = camera_object.parent.matrix_world.inverted().to_3x3() @ camera_step
+    
+    # Index of the first character of every line after the first
+    line_starts = [i + 1 for i, ch in enumerate(full_text) if ch == '\n']
+    fcurve = find_fcurve(font_data, '["char_count"]')
+    start_frames = [first_frame_with_count(fcurve, line_starts[k - 1], animation_start_frame, animation_end_frame)
+                    for k in range(window_lines, len(lines))]
+    
+    camera_base = camera_object.location.copy()
+    camera_object.keyframe_insert(data_path="location", frame=animation_start_frame)
+    for i, start_frame in enumerate(start_frames):
+        next_start = start_frames[i + 1] if i + 1 < len(start_frames) else start_frame + WINDOW_SCROLL_FRAMES
+        end_frame = max(start_frame + 1, min(start_frame + WINDOW_SCROLL_FRAMES, next_start))
+        
+        # Hold until the new line appears, then scroll it into view
+        camera_object.location = camera_base + camera_step * i
+        camera_object.keyframe_insert(data_path="location", frame=start_frame)
+        camera_object.location = camera_base + camera_step * (i + 1)
+        camera_object.keyframe_insert(data_path="location", frame=end_frame)
+    
+    print(f"Window mode: {window_lines} of {len(lines)} lines, camera scrolls {len(start_frames)} times")
+
+# --- Transparent Caption Compositing ---
+def video_extension(scene):
+    """File extension matching the scene's FFMPEG container"""
+    return ".mov" if scene.render.ffmpeg.format == 'QUICKTIME' else ".mp4"
+
+def setup_transparent_caption(scene, caption_objects):
+    """Render only the caption objects, with alpha, to a QuickTime Animation (RGBA) video"""
+    scene.render.film_transparent = True
+    for obj in scene.objects:
+        if obj.type in ('CAMERA', 'LIGHT') or obj in caption_objects:
+            continue
+        obj.hide_render = True
+    
+    scene.render.image_settings.file_format = 'FFMPEG'
+    scene.render.ffmpeg.format = 'QUICKTIME'
+    scene.render.ffmpeg.codec = 'QTRLE'
+    # Only available once the codec supports alpha
+    scene.render.image_settings.color_mode = 'RGBA'
+
+def composite_over_backgrounds(caption_file, backgrounds, scene):
+    """Overlay the transparent caption on every background with ffmpeg, several at a time.
+
+    Images are held for the length of the caption and videos are looped, both
+    scaled to the render resolution. Returns the list of composited files.
+    """
+    width = scene.render.resolution_x * scene.render.resolution_percentage // 100
+    height = scene.render.resolution_y * scene.render.resolution_percentage // 100
+    fps = scene.render.fps / scene.render.fps_base
+    caption_name = os.path.splitext(os.path.basename(caption_file))[0]
+    output_dir = os.path.dirname(caption_file)
+    
+    def composite(background):
+        background_name = os.path.splitext(os.path.basename(background))[0]
+        output_file = os.path.join(output_dir, f"{caption_name}_over_{background_name}.mp4")
+        if background.lower().endswith(IMAGE_EXTENSIONS):
+            background_input = ["-loop", "1", "-framerate", f"{fps:g}", "-i", background]
+        else:
+            background_input = ["-stream_loop", "-1", "-i", background]
+        
+        ffmpeg_cmd = [
+            "ffmpeg",
+            *background_input,
+            "-i", caption_file,
+            "-filter_complex",
+            f"[0:v]scale={width}:{height},setsar=1,fps={fps:g}[bg];"
+            f"[bg][1:v]overlay=shortest=1:format=auto,format=yuv420p[out]",
+            "-map", "[out]",
+            "-c:v", "libx264",
+            "-crf", "18",
+            "-y",  # Overwrite output
+            output_file
+        ]
+        try:
+            subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
+            return output_file, None
+        except subprocess.CalledProcessError as e:
+            return output_file, e.stderr[-1000:]
+        except FileNotFoundError:
+            return output_file, "ffmpeg not found. Please install ffmpeg to composite backgrounds."
+    
+    print(f"\nCompositing caption over {len(backgrounds)} background(s)...")
+    composited = []
+    with ThreadPoolExecutor(max_workers=min(len(backgrounds), COMPOSITE_MAX_PARALLEL)) as pool:
+        for background, (output_file, error) in zip(backgrounds, pool.map(composite, backgrounds)):
+            if error:
+                print(f"ERROR compositing over {background}: {error}")
+            else:
+                print(f"Successfully created: {output_file}")
+                composited.append(output_file)
+    return composited
+
+# --- Prepared Scene Handoff ---
+def save_prepared_scene(filepath, pack=False):
+    """Save the fully set up scene (animation, camera, render settings) for chunk workers.
+
+    With pack=True fonts, images and other external files are packed into the .blend,
+    for workers on other machines where neither relative nor absolute paths resolve.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+    if pack:
+        try:
+            bpy.ops.file.pack_all()
+        except RuntimeError as e:
+            print(f"Warning: Could not pack all external files: {e}")
+    # copy=True keeps this session pointing at the original template
+    bpy.ops.wm.save_as_mainfile(filepath=filepath, copy=True, compress=False)
+    print(f"Saved prepared scene: {filepath}")
+
+def render_prepared_chunk(start_frame, end_frame, chunk_id, safe_filename):
+    """Render a frame range of a scene the parent already set up and saved.
+
+    Handlers are not stored in .blend files, so only the handler is registered
+    again; text, keyframes, camera framing and render settings come from the file.
+    """
+    scene = bpy.context.scene
+    bpy.app.handlers.frame_change_post.clear()
+    bpy.app.handlers.frame_change_post.append(typewriter_handler)
+    
+    output_file = os.path.join(os.path.abspath("renders"), f"temp_{safe_filename}",
+                               f"chunk_{chunk_id}{video_extension(scene)}")
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    print(f"Chunk output file: {output_file}")
+    
+    scene.render.filepath = output_file
+    scene.frame_start = start_frame
+    scene.frame_end = end_frame
+    
+    print(f"Rendering chunk {chunk_id}: frames {start_frame}-{end_frame}...")
+    bpy.ops.render.render(animation=True)
+    print(f"Chunk {chunk_id} rendering complete.")
+
+# --- CPU Allocation ---
+def cgroup_cpu_limit():
+    """CPU quota of this process' cgroup in whole cores, or None if unlimited"""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, -(-int(quota) // int(period)))
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return max(1, -(-quota // period))
+    except (OSError, ValueError):
+        pass
+    return None
+
+def available_cpus():
+    """CPU ids this process may run on, trimmed to the cgroup quota"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(multiprocessing.cpu_count()))
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = cpus[:limit]
+    return cpus
+
+def choose_worker_count(template, quality, num_cpus, memory_limit=None):
+    """Pick how many parallel Blender instances to run from the measured scaling.
+
+    Without history this starts at DEFAULT_PARALLEL_PROCESSES. After that it
+    takes the worker count with the best measured frames per second and tries
+    one untested neighbour (double or half) per job, so it climbs towards the
+    best split for each template and quality. memory_limit caps the candidates
+    to the number of workers that fit in memory at once.
+    """
+    max_workers = max(1, min(MAX_PARALLEL_PROCESSES, num_cpus // MIN_THREADS_PER_WORKER))
+    if memory_limit is not None:
+        max_workers = max(1, min(max_workers, memory_limit))
+    candidates = []
+    workers = 1
+    while workers <= max_workers:
+        candidates.append(workers)
+        workers *= 2
+    if max_workers not in candidates:
+        candidates.append(max_workers)
+    
+    throughput = {}
+    # Only local parallel jobs say how this machine scales with the number of instances
+    for job in timing_history(template, quality, "parallel"):
+        if job["seconds"] > 0 and job["workers"] in candidates:
+            throughput.setdefault(job["workers"], []).append(job["frames"] / job["seconds"])
+    
+    if not throughput:
+        return min(DEFAULT_PARALLEL_PROCESSES, max_workers)
+    
+    best = max(throughput, key=lambda w: sorted(throughput[w])[len(throughput[w]) // 2])
+    larger = [w for w in candidates if w > best]
+    smaller = [w for w in candidates if w < best]
+    if larger and larger[0] not in throughput:
+        return larger[0]
+    if smaller and smaller[-1] not in throughput:
+        return smaller[-1]
+    return best
+
+def allocate_cpus(cpus, num_workers):
+    """Split the CPU ids into num_workers contiguous sets, spreading any remainder"""
+    per_worker, remainder = divmod(len(cpus), num_workers)
+    cpu_sets = []
+    start = 0
+    for i in range(num_workers):
+        count = max(1, per_worker + (1 if i < remainder else 0))
+        cpu_sets.append(cpus[start:start + count] or cpus[-count:])
+        start += count
+    return cpu_sets
+
+def launch_pinned(cmd, cpu_set, **popen_kwargs):
+    """Start cmd restricted to cpu_set (taskset where available, else pin after start)"""
+    taskset = shutil.which("taskset")
+    if taskset:
+        cmd = [taskset, "-c", ",".join(str(cpu) for cpu in cpu_set)] + cmd
+    process = subprocess.Popen(cmd, **popen_kwargs)
+    if not taskset and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(process.pid, cpu_set)
+        except OSError as e:
+            print(f"Warning: Could not pin process {process.pid}: {e}")
+    return process
+
+# --- Memory Admission ---
+def read_first_int(path):
+    with open(path) as f:
+        return int(f.read().split()[0])
+
+def available_memory_mb():
+    """Memory that can still be used, from /proc/meminfo and the cgroup limit. None if unknown"""
+    available = []
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available.append(int(line.split()[1]) / 1024)
+                    break
+    except OSError:
+        pass
+    
+    # cgroup v2, then v1 (a huge v1 limit means unlimited)
+    for limit_file, usage_file in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                                    "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        try:
+            limit = read_first_int(limit_file)
+            usage = read_first_int(usage_file)
+        except (OSError, ValueError):
+            continue  # "max" or not mounted
+        if limit < 1 << 60:
+            available.append((limit - usage) / (1024 * 1024))
+        break
+    
+    return min(available) if available else None
+
+def process_memory_mb(pid):
+    """(current RSS, peak RSS) of a running process in MB, or (None, None) if unknown"""
+    rss = peak = None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return rss, peak
+
+def estimate_worker_memory_mb(template, quality):
+    """Largest peak RSS of one worker recorded for this template and quality, or None"""
+    peaks = [job["peak_rss_mb"] for job in timing_history(template, quality, "parallel")
+             if job.get("peak_rss_mb")]
+    return max(peaks) if peaks else None
+
+def memory_worker_limit(worker_memory):
+    """How many workers of worker_memory MB fit in the available memory now, or None if unknown"""
+    available = available_memory_mb()
+    if available is None or not worker_memory:
+        return None
+    return max(1, int((available - MEMORY_RESERVE_MB) // worker_memory))
+
+def count_rendered_frames(log_file):
+    """Frames a chunk render has written so far, from Blender's log"""
+    try:
+        with open(log_file, errors="replace") as f:
+            return f.read().count("Append frame")
+    except OSError:
+        return 0
+
+# --- Render Farm (shared filesystem queue) ---
+# A job directory on the shared filesystem looks like:
+#   job.json, scene.blend, typewrite_para.py
+#   tasks/pending/<task>.json            waiting for a worker
+#   tasks/claimed/<task>@<worker>.json   being rendered, mtime is the worker heartbeat
+#   tasks/done/<task>.json               chunk video is in renders/temp_<name>/
+#   tasks/failed/<task>.json             gave up after FARM_MAX_ATTEMPTS
+# Every state change is a single os.rename, which is atomic on one filesystem,
+# so only one worker can win a pending task.
+FARM_TASK_STATES = ("pending", "claimed", "done", "failed")
+# Modules next to the script that it imports, copied into every job along with it
+FARM_HELPER_MODULES = ("tile_render.py", "render_profiles.py")
+
+def farm_task_dir(job_dir, state):
+    return os.path.join(job_dir, "tasks", state)
+
+def farm_create_job(farm_dir, blend_file, script_file, text, options, safe_filename, chunks, extension=".mp4"):
+    """Copy the scene and script to the shared directory and queue one task per chunk"""
+    job_dir = os.path.join(farm_dir, f"{safe_filename}_{int(time.time())}_{os.getpid()}")
+    for state in FARM_TASK_STATES:
+        os.makedirs(farm_task_dir(job_dir, state), exist_ok=True)
+    
+    shutil.copy2(blend_file, os.path.join(job_dir, "scene.blend"))
+    shutil.copy2(script_file, os.path.join(job_dir, "typewrite_para.py"))
+    for module in FARM_HELPER_MODULES:
+        shutil.copy2(os.path.join(os.path.dirname(os.path.abspath(script_file)), module), job_dir)
+    
+    job = {
+        "text": text,
+        "options": options,
+        "safe_filename": safe_filename,
+        "extension": extension,
+        "num_tasks": len(chunks),
+    }
+    with open(os.path.join(job_dir, "job.json"), 'w') as f:
+        json.dump(job, f, indent=2)
+    
+    # Write to a temporary name first so workers never see a half-written task
+    for start, end, chunk_id in chunks:
+        task = {"chunk_id": chunk_id, "start": start, "end": end, "attempts": 0}
+        task_file = os.path.join(farm_task_dir(job_dir, "pending"), f"chunk_{chunk_id:04d}.json")
+        with open(task_file + ".tmp", 'w') as f:
+            json.dump(task, f)
+        os.rename(task_file + ".tmp", task_file)
+    
+    return job_dir
+
+def farm_chunk_video(job_dir, safe_filename, chunk_id, extension):
+    return os.path.join(job_dir, "renders", f"temp_{safe_filename}", f"chunk_{chunk_id}{extension}")
+
+def farm_claim_task(farm_dir, worker_id):
+    """Atomically claim the first pending task in any job. Returns (job_dir, claim_file) or None"""
+    try:
+        job_names = sorted(os.listdir(farm_dir))
+    except FileNotFoundError:
+        return None
+    
+    for job_name in job_names:
+        job_dir = os.path.join(farm_dir, job_name)
+        pending_dir = farm_task_dir(job_dir, "pending")
+        try:
+            task_names = sorted(n for n in os.listdir(pending_dir) if n.endswith(".json"))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        
+        for task_name in task_names:
+            claim_name = f"{task_name[:-len('.json')]}@{worker_id}.json"
+            claim_file = os.path.join(farm_task_dir(job_dir, "claimed"), claim_name)
+            try:
+                os.rename(os.path.join(pending_dir, task_name), claim_file)
+            except OSError:
+                continue  # Another worker was faster
+            return job_dir, claim_file
+    return None
+
+def farm_release_task(job_dir, claim_file, state, task=None):
+    """Move a claimed task to `state`, optionally rewriting it. Returns False if the claim was lost"""
+    task_name = os.path.basename(claim_file).split("@")[0] + ".json"
+    if task is not None:
+        try:
+            # r+ so a claim that was already taken away is not recreated
+            with open(claim_file, 'r+') as f:
+                f.truncate(0)
+                json.dump(task, f)
+        except OSError:
+            return False
+    try:
+        os.rename(claim_file, os.path.join(farm_task_dir(job_dir, state), task_name))
+        return True
+    except OSError:
+        return False
+
+def farm_run_task(job_dir, claim_file, blender_path):
+    """Render one claimed chunk, touching the claim file as a heartbeat while Blender runs"""
+    with open(os.path.join(job_dir, "job.json")) as f:
+        job = json.load(f)
+    with open(claim_file) as f:
+        task = json.load(f)
+    
+    cmd = [
+        blender_path,
+        os.path.join(job_dir, "scene.blend"),
+        "--background",
+        "--python", os.path.join(job_dir, "typewrite_para.py"),
+        "--",
+        job["text"],
+        *job["options"],
+        "--chunk-render", str(task["start"]), str(task["end"]), str(task["chunk_id"]), job["safe_filename"]
+    ]
+    
+    print(f"Rendering {os.path.basename(job_dir)} chunk {task['chunk_id']}: frames {task['start']}-{task['end']}")
+    log_file = os.path.join(job_dir, "renders", f"chunk_{task['chunk_id']}.log")
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    with open(log_file, 'w') as log:
+        # Relative output paths in the chunk render resolve inside the job directory
+        process = subprocess.Popen(cmd, cwd=job_dir, stdout=log, stderr=subprocess.STDOUT)
+        
+        while process.poll() is None:
+            try:
+                os.utime(claim_file)
+            except FileNotFoundError:
+                # The coordinator reclaimed the task, someone else is rendering it now
+                print(f"Lost claim on chunk {task['chunk_id']}, stopping render")
+                process.kill()
+                process.wait()
+                return False
+            time.sleep(FARM_HEARTBEAT_SECONDS)
+    
+    chunk_video = farm_chunk_video(job_dir, job["safe_filename"], task["chunk_id"], job.get("extension", ".mp4"))
+    if process.returncode == 0 and os.path.exists(chunk_video):
+        print(f"Chunk {task['chunk_id']} completed successfully")
+        task["worker"] = os.path.basename(claim_file).split("@", 1)[1][:-len(".json")]
+        return farm_release_task(job_dir, claim_file, "done", task)
+    
+    task["attempts"] = task.get("attempts", 0) + 1
+    state = "failed" if task["attempts"] >= FARM_MAX_ATTEMPTS else "pending"
+    print(f"ERROR in chunk {task['chunk_id']} (attempt {task['attempts']}), see {log_file}")
+    farm_release_task(job_dir, claim_file, state, task)
+    return False
+
+def farm_worker_loop(farm_dir, blender_path, idle_exit_seconds=None):
+    """Claim and render tasks from farm_dir until idle for idle_exit_seconds (forever if None)"""
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Farm worker {worker_id} watching {farm_dir}")
+    idle_since = time.time()
+    
+    while True:
+        claimed = farm_claim_task(farm_dir, worker_id)
+        if claimed:
+            job_dir, claim_file = claimed
+            try:
+                farm_run_task(job_dir, claim_file, blender_path)
+            except OSError as e:
+                # The job directory can disappear if the coordinator gave up on it
+                print(f"Error running task {claim_file}: {e}")
+            idle_since = time.time()
+            continue
+        
+        if idle_exit_seconds is not None and time.time() - idle_since > idle_exit_seconds:
+            print("No work left, exiting")
+            return
+        time.sleep(FARM_POLL_SECONDS)
+
+def farm_worker_count(job_dir):
+    """Number of distinct workers that finished tasks of a job"""
+    workers = set()
+    done_dir = farm_task_dir(job_dir, "done")
+    for task_name in os.listdir(done_dir):
+        try:
+            with open(os.path.join(done_dir, task_name)) as f:
+                workers.add(json.load(f).get("worker"))
+        except (OSError, ValueError):
+            continue
+    return max(len(workers), 1)
+
+def farm_requeue_tasks(job_dir, chunk_ids):
+    """Move finished tasks back to pending so workers render those chunks again"""
+    for chunk_id in chunk_ids:
+        task_name = f"chunk_{chunk_id:04d}.json"
+        os.rename(os.path.join(farm_task_dir(job_dir, "done"), task_name),
+                  os.path.join(farm_task_dir(job_dir, "pending"), task_name))
+
+def farm_wait_for_job(job_dir, num_tasks, progress=None):
+    """Wait until all tasks are done, reclaiming claims whose heartbeat stopped. Returns True on success.
+
+    If progress is a dict, the times the first task was claimed and the last one
+    finished are stored in it as "first_claim" and "last_done".
+    """
+    # Heartbeats are judged by when we last saw the mtime change, not by comparing
+    # clocks, so workers with skewed clocks are not reclaimed by mistake
+    last_heartbeat = {}
+    
+    while True:
+        done = len(os.listdir(farm_task_dir(job_dir, "done")))
+        failed = os.listdir(farm_task_dir(job_dir, "failed"))
+        claims = os.listdir(farm_task_dir(job_dir, "claimed"))
+        print(f"Farm progress: {done}/{num_tasks} done, {len(claims)} rendering, {len(failed)} failed")
+        if progress is not None and (claims or done) and "first_claim" not in progress:
+            progress["first_claim"] = time.time()
+        
+        if failed:
+            print(f"ERROR: Tasks failed after {FARM_MAX_ATTEMPTS} attempts: {', '.join(sorted(failed))}")
+            return False
+        if done >= num_tasks:
+            if progress is not None:
+                progress["last_done"] = time.time()
+            return True
+        
+        now = time.time()
+        for claim_name in claims:
+            claim_file = os.path.join(farm_task_dir(job_dir, "claimed"), claim_name)
+            try:
+                mtime = os.stat(claim_file).st_mtime
+            except FileNotFoundError:
+                continue
+            
+            seen_mtime, seen_at = last_heartbeat.get(claim_name, (None, now))
+            if mtime != seen_mtime:
+                last_heartbeat[claim_name] = (mtime, now)
+            elif now - seen_at > FARM_STALE_SECONDS:
+                worker = claim_name.split("@", 1)[1][:-len(".json")]
+                print(f"Worker {worker} stopped responding, requeueing {claim_name.split('@')[0]}")
+                farm_release_task(job_dir, claim_file, "pending")
+                last_heartbeat.pop(claim_name, None)
+        
+        time.sleep(FARM_POLL_SECONDS)
+
 # --- Main Script ---
 # Only execute if we're in Blender
 if IN_BLENDER:
+    # Shared Blender helpers (tiled stills, contact sheets) live next to this script
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import tile_render
+    import render_profiles
+    
     # Check if we're in a subprocess for chunk rendering
     is_chunk_render = "--chunk-render" in sys.argv
     chunk_start_frame = None
@@ -273,15 +1501,76 @@ if IN_BLENDER:
             print("Error: Invalid chunk render arguments")
             sys.exit(1)
 
+    # Chunks always render the scene the parent already set up, so they skip straight to rendering
+    if is_chunk_render:
+        render_prepared_chunk(chunk_start_frame, chunk_end_frame, chunk_id, chunk_safe_filename)
+        sys.exit(0)
+
     # 1. Get the text string from the command line arguments
     try:
         argv = sys.argv
         argv = argv[argv.index("--") + 1:]
         
-        # If we're in chunk render mode, stop before the --chunk-render flag
-        if "--chunk-render" in argv:
-            chunk_index = argv.index("--chunk-render")
-            argv = argv[:chunk_index]  # Only take arguments before --chunk-render
+        # Options are stripped from the text
+        use_glyph_meshes = USE_GLYPH_MESHES
+        if pop_option(argv, "--glyph-mesh"):
+            use_glyph_meshes = True
+        
+        window_lines = WINDOW_LINES
+        window_option = pop_option(argv, "--window-lines", 1)
+        if window_option:
+            window_lines = int(window_option[0])
+        if window_lines > 0 and use_glyph_meshes:
+            print("Warning: --glyph-mesh is ignored in window mode, which already bounds the layout cost")
+            use_glyph_meshes = False
+        
+        # --over can be given several times, each background gets its own composite
+        composite_backgrounds = []
+        while "--over" in argv:
+            composite_backgrounds.append(os.path.abspath(pop_option(argv, "--over", 1)[0]))
+        transparent_caption = bool(pop_option(argv, "--transparent")) or bool(composite_backgrounds)
+        
+        # --still can be given several times, each frame is rendered in parallel tiles
+        still_frames = []
+        while "--still" in argv:
+            still_frames.append(int(pop_option(argv, "--still", 1)[0]))
+        still_tiles = pop_option(argv, "--tiles", 1)
+        
+        max_frames = MAX_TOTAL_FRAMES
+        max_frames_option = pop_option(argv, "--max-frames", 1)
+        if max_frames_option:
+            max_frames = int(max_frames_option[0])
+        max_seconds = MAX_TOTAL_SECONDS
+        max_seconds_option = pop_option(argv, "--max-seconds", 1)
+        if max_seconds_option:
+            max_seconds = float(max_seconds_option[0])
+        # Frame 1 and at least one typing frame always remain
+        if max_frames is not None and max_frames < 2:
+            print(f"Error: --max-frames must be at least 2, got {max_frames}")
+            sys.exit(1)
+        if max_seconds is not None and max_seconds <= 0:
+            print(f"Error: --max-seconds must be positive, got {max_seconds:g}")
+            sys.exit(1)
+        
+        plan_only = bool(pop_option(argv, "--plan"))
+        verify_output = VERIFY_OUTPUT and not pop_option(argv, "--no-verify")
+        preview_only = bool(pop_option(argv, "--preview"))
+        
+        farm_dir = pop_option(argv, "--farm", 1)
+        if farm_dir:
+            farm_dir = os.path.abspath(farm_dir[0])
+        
+        render_engine = RENDER_ENGINE
+        engine_option = pop_option(argv, "--engine", 1)
+        if engine_option:
+            render_engine = engine_option[0]
+        elif farm_dir and render_engine == "auto":
+            # Farm workers may have no GPU even when this machine has one, and every chunk has to match
+            render_engine = "cycles"
+        render_engine = render_profiles.resolve_render_engine(render_engine)
+        
+        if not argv:
+            raise IndexError
         
         # Handle multiple arguments as separate lines or single argument with \n
         if len(argv) == 1:
@@ -303,6 +1592,16 @@ if IN_BLENDER:
         print('  blender scene.blend --python script.py -- "Single line text"')
         print('  blender scene.blend --python script.py -- "First line\\nSecond line"')
         print('  blender scene.blend --python script.py -- "Line 1" "Line 2" "Line 3"')
+        print('  blender scene.blend --python script.py -- "Long text" --glyph-mesh')
+        print('  blender scene.blend --python script.py -- "Long text" --farm /shared/render_queue')
+        print('  blender scene.blend --python script.py -- "Long text" --window-lines 12')
+        print('  blender scene.blend --python script.py -- "Caption" --over background1.mp4 --over background2.png')
+        print('  blender scene.blend --python script.py -- "Hero frame" --still 120 --tiles 4x2')
+        print('  blender scene.blend --python script.py -- "Long text" --max-seconds 20')
+        print('  blender scene.blend --python script.py -- "Long text" --plan')
+        print('  blender scene.blend --python script.py -- "Long text" --preview')
+        print('  blender scene.blend --python script.py -- "Long text" --no-verify')
+        print('  blender scene.blend --python script.py -- "Long text" --engine cycles')
         sys.exit(1)
 
     # 2. Get the main objects from the scene
@@ -338,17 +1637,35 @@ if IN_BLENDER:
 
     # 4. Calculate and set optimal camera position BEFORE animation starts
     print("Calculating optimal camera position...")
-    calculate_and_set_camera_position(text_object, cursor_object, camera_object, bpy.context.scene)
+    if window_lines > 0:
+        frame_camera_on_window(text_object, cursor_object, camera_object, bpy.context.scene, window_lines)
+    else:
+        calculate_and_set_camera_position(text_object, cursor_object, camera_object, bpy.context.scene)
 
     # 5. Animate the text with padding
     full_text_length = len(text_to_animate)
     typing_speed_factor = 3
-    animation_start_frame = 1 + PRE_ANIMATION_FRAMES
+    pre_animation_frames = PRE_ANIMATION_FRAMES
+    post_animation_frames = POST_ANIMATION_FRAMES
     typing_duration_frames = full_text_length * typing_speed_factor
 
     if typing_duration_frames < 1:
         typing_duration_frames = 1
 
+    # Squeeze the whole video into the frame budget by typing several characters per frame
+    if max_seconds is not None:
+        scene_fps = bpy.context.scene.render.fps / bpy.context.scene.render.fps_base
+        seconds_frames = int(max_seconds * scene_fps)
+        if seconds_frames < 2:
+            print(f"Error: --max-seconds {max_seconds:g} is only {seconds_frames} frame(s) at {scene_fps:g} fps, at least 2 are needed")
+            sys.exit(1)
+        max_frames = min(max_frames or float("inf"), seconds_frames)
+    if max_frames is not None:
+        pre_animation_frames, typing_duration_frames, post_animation_frames = fit_frame_budget(
+            pre_animation_frames, typing_duration_frames, post_animation_frames, max_frames)
+        print(f"Frame budget {max_frames}: typing {full_text_length / typing_duration_frames:.2f} chars per frame")
+
+    animation_start_frame = 1 + pre_animation_frames
     animation_end_frame = animation_start_frame + typing_duration_frames
 
     bpy.context.scene.frame_current = animation_start_frame
@@ -360,23 +1677,40 @@ if IN_BLENDER:
     text_object.data.keyframe_insert(data_path='["char_count"]', frame=animation_end_frame)
 
     bpy.context.scene.frame_start = 1
-    bpy.context.scene.frame_end = animation_end_frame + POST_ANIMATION_FRAMES
+    bpy.context.scene.frame_end = animation_end_frame + post_animation_frames
+
+    # Only lay out the last lines and scroll the camera along with them
+    if window_lines > 0:
+        setup_window_scroll(text_object, camera_object, window_lines, animation_start_frame, animation_end_frame)
+
+    # Optionally tessellate the full text once instead of re-laying it out every frame
+    glyph_object = None
+    if use_glyph_meshes:
+        print("Building per-character glyph mesh...")
+        glyph_object = build_glyph_mesh(text_object)
 
     # 6. Register the handler function
     bpy.app.handlers.frame_change_post.clear()
     bpy.app.handlers.frame_change_post.append(typewriter_handler)
 
     # --- Configure Render Settings ---
-    bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
+    # The Cycles profile has its own sample counts, EEVEE samples follow the flag at the top of the file
+    if render_engine == "cycles":
+        print("--- Rendering with Cycles on the CPU ---")
+        render_profiles.setup_cycles_cpu(bpy.context.scene, IS_FAST_MODE)
+    else:
+        bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
+        if IS_FAST_MODE:
+            bpy.context.scene.eevee.taa_render_samples = 8
+        else:
+            bpy.context.scene.eevee.taa_render_samples = 128 # A good default for quality
 
     # Set render quality based on the flag at the top of the file
     if IS_FAST_MODE:
         print("--- Running in FAST TEST mode ---")
-        bpy.context.scene.eevee.taa_render_samples = 8
         bpy.context.scene.render.resolution_percentage = 50
     else:
         print("--- Running in HIGH QUALITY mode ---")
-        bpy.context.scene.eevee.taa_render_samples = 128 # A good default for quality
         bpy.context.scene.render.resolution_percentage = 100
 
     bpy.context.scene.render.image_settings.file_format = 'FFMPEG'
@@ -384,6 +1718,11 @@ if IN_BLENDER:
     bpy.context.scene.render.ffmpeg.codec = 'H264'
     bpy.context.scene.render.ffmpeg.video_bitrate = 10000
 
+    # Render the caption alone with alpha, so it can be composited over any background
+    if transparent_caption:
+        print("--- Rendering transparent caption ---")
+        setup_transparent_caption(bpy.context.scene, [text_object, cursor_object, glyph_object])
+
     output_dir = "renders"
     output_path = os.path.abspath(output_dir)
 
@@ -402,136 +1741,279 @@ if IN_BLENDER:
     safe_filename = text_to_animate.replace(" ", "_").replace(":", "").replace("/", "").replace("\n", "_")[:50]
 
     # Determine if we should use parallel rendering
-    total_frames = animation_end_frame + POST_ANIMATION_FRAMES
-    use_parallel = total_frames > PARALLEL_FRAME_THRESHOLD and not is_chunk_render
+    total_frames = animation_end_frame + post_animation_frames
+    use_farm = farm_dir is not None
+    use_parallel = total_frames > PARALLEL_FRAME_THRESHOLD and not use_farm
+
+    # Lay out the chunks up front so --plan shows exactly what would run
+    render_template = os.path.basename(bpy.data.filepath)
+    render_quality = "fast" if IS_FAST_MODE else "high"
+    if render_engine == "cycles":
+        # Cycles timings don't predict EEVEE ones, keep them apart in the history
+        render_quality += "-cycles"
+    if use_farm:
+        # Small tasks so fast machines pick up more of the work
+        render_mode = "farm"
+        chunks = split_frames_fixed(total_frames, FARM_FRAMES_PER_TASK)
+    elif use_parallel:
+        render_mode = "parallel"
+        # Divide the usable cores between the workers instead of letting each one use them all.
+        # Only as many workers as fit in memory are planned, so no cores are reserved for
+        # workers that would sit in the admission queue
+        worker_cpus = available_cpus()
+        worker_memory = estimate_worker_memory_mb(render_template, render_quality)
+        num_processes = choose_worker_count(render_template, render_quality, len(worker_cpus),
+                                            memory_worker_limit(worker_memory))
+        worker_cpu_sets = allocate_cpus(worker_cpus, num_processes)
+        chunks = split_frames_even(total_frames, num_processes)
+    else:
+        render_mode = "single"
+        chunks = [(1, total_frames, 0)]
+    
+    if verify_output and not (plan_only or preview_only or still_frames):
+        expected_changes, expected_visible = expected_frame_changes(text_object, cursor_object, camera_object, total_frames)
+    
+    render_start_time = time.time()
 
-    if use_parallel:
+    if plan_only:
+        print_render_plan(render_template, render_quality, animation_start_frame, animation_end_frame,
+                          total_frames, render_mode, chunks)
+        
+    elif preview_only:
+        print(f"\n=== PREVIEW MODE ===")
+        scene = bpy.context.scene
+        
+        # Blink is "on" when (frame // BLINK_SPEED_FRAMES) is even
+        cursor_on_frame = animation_end_frame + 1
+        while (cursor_on_frame // BLINK_SPEED_FRAMES) % 2 and cursor_on_frame < total_frames:
+            cursor_on_frame += 1
+        
+        preview_frames = [
+            ("first typed character", first_frame_with_count(find_fcurve(text_object.data, '["char_count"]'), 1,
+                                                             animation_start_frame, animation_end_frame)),
+            ("mid typing", (animation_start_frame + animation_end_frame) // 2),
+            ("full text, cursor on", cursor_on_frame),
+        ]
+        
+        preview_dir = os.path.join(output_path, f"preview_{safe_filename}")
+        image_paths = tile_render.render_preview_frames(scene, preview_frames, preview_dir)
+        
+        sheet_path = os.path.join(output_path, f"{safe_filename}_preview.png")
+        tile_render.save_contact_sheet(image_paths, sheet_path, columns=len(image_paths))
+        shutil.rmtree(preview_dir, ignore_errors=True)
+        print(f"Contact sheet saved to: {sheet_path}")
+        
+    elif still_frames:
+        print(f"\n=== TILED STILL MODE ===")
+        columns, rows = tile_render.parse_tiles(still_tiles[0]) if still_tiles else (None, None)
+        still_dir = os.path.join(output_path, f"temp_{safe_filename}")
+        for frame in still_frames:
+            # Tile workers don't run frame handlers, so bake this frame's text and cursor into the file
+            bpy.context.scene.frame_set(frame)
+            prepared_file = os.path.join(still_dir, f"prepared_{frame:04d}.blend")
+            save_prepared_scene(prepared_file)
+            tile_render.render_tiled_frames(prepared_file, [frame], output_path, safe_filename, columns, rows)
+        shutil.rmtree(still_dir, ignore_errors=True)
+        
+    elif use_farm:
+        print(f"\n=== FARM RENDERING MODE ===")
+        
+        # Workers get the set up scene with external files packed, so they neither repeat the
+        # setup nor depend on paths that only exist on this machine
+        prepared_dir = os.path.join(output_path, f"temp_{safe_filename}")
+        save_prepared_scene(os.path.join(prepared_dir, "prepared.blend"), pack=True)
+        job_dir = farm_create_job(farm_dir, os.path.join(prepared_dir, "prepared.blend"), os.path.abspath(__file__),
+                                  text_to_animate[:-1], [], safe_filename, chunks,
+                                  video_extension(bpy.context.scene))
+        shutil.rmtree(prepared_dir, ignore_errors=True)
+        print(f"Queued {len(chunks)} tasks in {job_dir}")
+        print("Start workers on any machine that can see the shared directory with:")
+        print(f'  python typewrite_para.py --farm-worker "{farm_dir}" --blender <blender path>')
+        
+        # Time the rendering from the first claim, not from queueing, which may wait for workers for hours
+        farm_progress = {}
+        job_ok = farm_wait_for_job(job_dir, len(chunks), farm_progress)
+        farm_render_seconds = farm_progress.get("last_done", 0) - farm_progress.get("first_claim", 0)
+        chunk_videos = [farm_chunk_video(job_dir, safe_filename, chunk_id, video_extension(bpy.context.scene))
+                        for _, _, chunk_id in chunks]
+        qa_results = None
+        if job_ok and verify_output:
+            for attempt in range(QA_RERENDER_ATTEMPTS + 1):
+                qa_results = verify_chunks(chunk_videos, chunks, expected_changes, expected_visible, bpy.context.scene)
+                bad_chunks = [chunk_id for chunk_id, result in (qa_results or {}).items() if result["errors"]]
+                if not bad_chunks or attempt == QA_RERENDER_ATTEMPTS:
+                    break
+                print(f"Re-rendering chunk(s) {', '.join(map(str, bad_chunks))}...")
+                farm_requeue_tasks(job_dir, bad_chunks)
+                job_ok = farm_wait_for_job(job_dir, len(chunks))
+                if not job_ok:
+                    break
+        
+        if job_ok:
+            print("\nCombining chunks into final video...")
+            output_file = os.path.join(output_path, f"{safe_filename}{video_extension(bpy.context.scene)}")
+            
+            if concat_chunk_videos(chunk_videos, os.path.join(job_dir, "concat_list.txt"), output_file):
+                if farm_render_seconds > 0:
+                    record_timing(render_template, render_quality, render_mode, total_frames,
+                                  farm_worker_count(job_dir), farm_render_seconds)
+                write_job_report(os.path.join(output_path, f"{safe_filename}_report.json"), {
+                    "output": output_file, "mode": render_mode, "frames": total_frames,
+                    "seconds": round(time.time() - render_start_time, 1), "chunks": qa_results,
+                })
+                shutil.rmtree(job_dir, ignore_errors=True)
+                print("Cleaned up farm job")
+                if composite_backgrounds:
+                    composite_over_backgrounds(output_file, composite_backgrounds, bpy.context.scene)
+            else:
+                print(f"Chunk videos are preserved in: {job_dir}")
+        else:
+            print(f"Farm job did not complete, logs and chunks are in: {job_dir}")
+        
+        print("\n=== FARM RENDERING COMPLETE ===")
+        bpy.ops.wm.quit_blender()
+        
+    elif use_parallel:
         print(f"\n=== PARALLEL RENDERING MODE ===")
         print(f"Total frames ({total_frames}) exceeds threshold ({PARALLEL_FRAME_THRESHOLD})")
         print(f"Splitting into multiple chunks for parallel rendering...")
         
-        # Calculate chunk size and number of processes
-        num_processes = min(MAX_PARALLEL_PROCESSES, multiprocessing.cpu_count())
-        frames_per_chunk = total_frames // num_processes
-        
         # Create temp directory for image sequences
         temp_dir = os.path.join(output_path, f"temp_{safe_filename}")
         if not os.path.exists(temp_dir):
             os.makedirs(temp_dir)
         
-        # Prepare chunk ranges
-        chunks = []
-        for i in range(num_processes):
-            start = 1 + (i * frames_per_chunk)
-            if i == num_processes - 1:
-                # Last chunk gets any remaining frames
-                end = total_frames
-            else:
-                end = start + frames_per_chunk - 1
-            chunks.append((start, end, i))
+        # Set up once here, the chunks open the prepared scene and go straight to rendering
+        prepared_file = os.path.join(temp_dir, "prepared.blend")
+        save_prepared_scene(prepared_file)
         
-        print(f"Launching {num_processes} parallel Blender instances...")
+        print(f"Launching {num_processes} parallel Blender instances on {len(worker_cpus)} CPUs...")
         for start, end, chunk_id in chunks:
-            print(f"  Chunk {chunk_id}: Frames {start}-{end}")
+            print(f"  Chunk {chunk_id}: Frames {start}-{end}, {len(worker_cpu_sets[chunk_id])} threads")
         
-        # Launch parallel Blender processes
-        processes = []
-        for start, end, chunk_id in chunks:
-            # Build command for subprocess
-            blend_file = bpy.data.filepath
-            script_file = os.path.abspath(__file__)
+        # Launch parallel Blender processes while there is memory for them, queue the rest
+        script_file = os.path.abspath(__file__)
+        pending = list(chunks)
+        running = {}  # chunk_id -> (process, log file, log handle)
+        peak_rss = {}  # chunk_id -> peak RSS in MB
+        max_concurrent = 0
+        last_status = None
+        all_chunks_ok = True
+        
+        chunk_videos = [os.path.join(temp_dir, f"chunk_{chunk_id}{video_extension(bpy.context.scene)}")
+                        for _, _, chunk_id in chunks]
+        qa_results = None
+        # The history only gets the first rendering pass, without the scene save, QA or re-renders
+        render_phase_start = time.time()
+        for attempt in range(QA_RERENDER_ATTEMPTS + 1):
+            print("\nRendering chunks in parallel...")
+            while pending or running:
+                # --- Track memory of the running workers and collect finished ones ---
+                for chunk_id, (process, log_file, log) in list(running.items()):
+                    _, peak = process_memory_mb(process.pid)
+                    if peak:
+                        peak_rss[chunk_id] = max(peak_rss.get(chunk_id, 0), peak)
+                
+                    if process.poll() is None:
+                        continue
+                    log.close()
+                    del running[chunk_id]
+                    if process.returncode != 0:
+                        all_chunks_ok = False
+                        print(f"ERROR in chunk {chunk_id}:")
+                        with open(log_file, errors="replace") as f:
+                            print("".join(f.readlines()[-20:]))
+                    else:
+                        print(f"Chunk {chunk_id} completed successfully")
             
-            cmd = [
-                bpy.app.binary_path,  # Blender executable
-                blend_file,
-                "--background",
-                "--python", script_file,
-                "--",
-                text_to_animate[:-1],  # Remove the trailing space we added
-                "--chunk-render", str(start), str(end), str(chunk_id), safe_filename  # Pass safe filename
-            ]
+                # The first frames of a worker show how much memory one instance needs
+                probed = [peak_rss[chunk_id] for chunk_id, (_, log_file, _) in running.items()
+                          if chunk_id in peak_rss and count_rendered_frames(log_file) >= MEMORY_PROBE_FRAMES]
+                finished = [peak_rss[chunk_id] for _, _, chunk_id in chunks
+                            if chunk_id in peak_rss and chunk_id not in running]
+                if probed or finished:
+                    worker_memory = max([worker_memory or 0] + probed + finished)
             
-            print(f"Starting chunk {chunk_id}...")
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            processes.append((process, chunk_id))
-        
-        # Wait for all processes to complete
-        print("\nRendering chunks in parallel...")
-        for process, chunk_id in processes:
-            stdout, stderr = process.communicate()
-            if process.returncode != 0:
-                print(f"ERROR in chunk {chunk_id}:")
-                print(stderr.decode())
-            else:
-                print(f"Chunk {chunk_id} completed successfully")
+                # --- Admit more workers ---
+                while pending:
+                    if running:
+                        available = available_memory_mb()
+                        if available is not None:
+                            if worker_memory is None:
+                                break  # Wait for the first worker to be measured
+                            # Running workers that have not reached their peak yet will still grow
+                            growth = sum(max(0.0, worker_memory - (process_memory_mb(p.pid)[0] or 0.0))
+                                         for p, _, _ in running.values())
+                            if available - growth - MEMORY_RESERVE_MB < worker_memory:
+                                break
+                
+                    start, end, chunk_id = pending.pop(0)
+                    cmd = [
+                        bpy.app.binary_path,  # Blender executable
+                        prepared_file,
+                        "--threads", str(len(worker_cpu_sets[chunk_id])),
+                        "--background",
+                        "--python", script_file,
+                        "--",
+                        "--chunk-render", str(start), str(end), str(chunk_id), safe_filename  # Pass safe filename
+                    ]
+                
+                    print(f"Starting chunk {chunk_id}...")
+                    log_file = os.path.join(temp_dir, f"chunk_{chunk_id}.log")
+                    log = open(log_file, 'w')
+                    process = launch_pinned(cmd, worker_cpu_sets[chunk_id], stdout=log, stderr=subprocess.STDOUT)
+                    running[chunk_id] = (process, log_file, log)
+                    max_concurrent = max(max_concurrent, len(running))
+            
+                if pending and (len(running), len(pending)) != last_status:
+                    print(f"Memory: {len(running)} running, {len(pending)} queued "
+                          f"(~{worker_memory or 0:.0f} MB per worker, {available_memory_mb() or 0:.0f} MB available)")
+                last_status = (len(running), len(pending))
+                time.sleep(MEMORY_POLL_SECONDS)
+            
+            if attempt == 0:
+                render_seconds = time.time() - render_phase_start
+                first_pass_ok = all_chunks_ok
+            if not verify_output:
+                break
+            qa_results = verify_chunks(chunk_videos, chunks, expected_changes, expected_visible, bpy.context.scene)
+            bad_chunks = [chunk_id for chunk_id, result in (qa_results or {}).items() if result["errors"]]
+            if not bad_chunks or attempt == QA_RERENDER_ATTEMPTS:
+                break
+            # Only the ranges that failed are rendered again
+            print(f"Re-rendering chunk(s) {', '.join(map(str, bad_chunks))}...")
+            pending = [chunk for chunk in chunks if chunk[2] in bad_chunks]
+            all_chunks_ok = True
         
         # Combine image sequences with ffmpeg
         print("\nCombining chunks into final video...")
-        output_file = os.path.join(output_path, f"{safe_filename}.mp4")
+        output_file = os.path.join(output_path, f"{safe_filename}{video_extension(bpy.context.scene)}")
         
-        # Create a list file for ffmpeg concat
-        concat_file = os.path.join(temp_dir, "concat_list.txt")
-        with open(concat_file, 'w') as f:
-            for _, _, chunk_id in chunks:
-                chunk_video = os.path.join(temp_dir, f"chunk_{chunk_id}.mp4")
-                f.write(f"file '{chunk_video}'\n")
-        
-        # Use ffmpeg to concatenate
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_file,
-            "-c", "copy",
-            "-y",  # Overwrite output
-            output_file
-        ]
-        
-        try:
-            result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
-            print(f"Successfully created: {output_file}")
+        if concat_chunk_videos(chunk_videos, os.path.join(temp_dir, "concat_list.txt"), output_file):
+            if first_pass_ok:
+                record_timing(render_template, render_quality, render_mode, total_frames, max_concurrent,
+                              render_seconds, max(peak_rss.values(), default=None))
+            write_job_report(os.path.join(output_path, f"{safe_filename}_report.json"), {
+                "output": output_file, "mode": render_mode, "frames": total_frames,
+                "seconds": round(time.time() - render_start_time, 1), "workers": max_concurrent,
+                "chunks": qa_results,
+            })
             
             # Clean up temp files
-            import shutil
             shutil.rmtree(temp_dir)
             print("Cleaned up temporary files")
-            
-        except subprocess.CalledProcessError as e:
-            print(f"Error combining videos with ffmpeg: {e}")
-            print(f"ffmpeg output: {e.stderr}")
+            if composite_backgrounds:
+                composite_over_backgrounds(output_file, composite_backgrounds, bpy.context.scene)
+        else:
             print(f"Chunk videos are preserved in: {temp_dir}")
-        except FileNotFoundError:
-            print("ERROR: ffmpeg not found. Please install ffmpeg to combine video chunks.")
-            print(f"Individual chunks are saved in: {temp_dir}")
         
         # Exit after coordinating parallel render
         print("\n=== PARALLEL RENDERING COMPLETE ===")
         bpy.ops.wm.quit_blender()
         
-    elif is_chunk_render:
-        # We're rendering a specific chunk - use the safe filename passed from parent
-        output_file = os.path.join(output_path, f"temp_{chunk_safe_filename}", f"chunk_{chunk_id}.mp4")
-        
-        # Ensure temp directory exists
-        temp_dir = os.path.dirname(output_file)
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-        
-        print(f"Chunk output file: {output_file}")
-        bpy.context.scene.render.filepath = output_file
-        
-        # Set frame range for this chunk
-        bpy.context.scene.frame_start = chunk_start_frame
-        bpy.context.scene.frame_end = chunk_end_frame
-        
-        # --- Render the chunk ---
-        print(f"Rendering chunk {chunk_id}: frames {chunk_start_frame}-{chunk_end_frame}...")
-        bpy.ops.render.render(animation=True)
-        print(f"Chunk {chunk_id} rendering complete.")
-        
     else:
         # Normal single-process rendering
-        output_file = os.path.join(output_path, f"{safe_filename}.mp4")
+        output_file = os.path.join(output_path, f"{safe_filename}{video_extension(bpy.context.scene)}")
         print(f"Output file will be: {output_file}")
         bpy.context.scene.render.filepath = output_file
         
@@ -539,7 +2021,35 @@ if IN_BLENDER:
         print(f"Rendering text animation for: '{text_to_animate}'...")
         bpy.ops.render.render(animation=True)
         print("Rendering complete.")
+        record_timing(render_template, render_quality, render_mode, total_frames, 1, time.time() - render_start_time)
+        
+        # Nothing to re-render around in a single process, so problems are only reported
+        qa_results = None
+        if verify_output:
+            qa_results = verify_chunks([output_file], chunks, expected_changes, expected_visible, bpy.context.scene)
+        write_job_report(os.path.join(output_path, f"{safe_filename}_report.json"), {
+            "output": output_file, "mode": render_mode, "frames": total_frames,
+            "seconds": round(time.time() - render_start_time, 1), "chunks": qa_results,
+        })
+        if composite_backgrounds:
+            composite_over_backgrounds(output_file, composite_backgrounds, bpy.context.scene)
 
     # --- Cleanup and Exit ---
     bpy.app.handlers.frame_change_post.remove(typewriter_handler)
-    bpy.ops.wm.quit_blender()
\ No newline at end of file
+    bpy.ops.wm.quit_blender()
+
+# --- Farm Worker ---
+# Runs outside Blender: python typewrite_para.py --farm-worker <shared dir> [--blender <path>] [--idle-exit <seconds>]
+if not IN_BLENDER and __name__ == "__main__":
+    worker_args = sys.argv[1:]
+    worker_farm_dir = pop_option(worker_args, "--farm-worker", 1)
+    if not worker_farm_dir:
+        print("Usage: python typewrite_para.py --farm-worker <shared dir> [--blender <path>] [--idle-exit <seconds>]")
+        sys.exit(1)
+    
+    worker_blender = pop_option(worker_args, "--blender", 1)
+    worker_idle_exit = pop_option(worker_args, "--idle-exit", 1)
+    
+    farm_worker_loop(os.path.abspath(worker_farm_dir[0]),
+                     worker_blender[0] if worker_blender else os.environ.get("BLENDER", "blender"),
+                     float(worker_idle_exit[0]) if worker_idle_exit else None)
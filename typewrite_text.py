@@ -4,6 +4,9 @@ import sys
 from bpy.app.handlers import persistent
 from mathutils import Vector
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import render_profiles
+
 # --- Configuration ---
 IS_FAST_MODE = True # Set to True for faster rendering, False for detailed rendering
 BLINK_SPEED_FRAMES = 10 # How many frames for each blink state (on or off)
@@ -11,6 +14,7 @@ PRE_ANIMATION_FRAMES = 24
 POST_ANIMATION_FRAMES = 48
 CURSOR_OFFSET_X = -.14  # Offset for the cursor position
 CURSOR_OFFSET_Y = 0.29  # Offset for the cursor position
+RENDER_ENGINE = "auto"  # "eevee", "cycles" or "auto" (Cycles on the CPU when there is no GPU)
 TEXT_MARGIN_FACTOR = 1.2  # How much extra space to leave around text (1.2 = 20% extra)
 
 # --- Handler Function ---
@@ -137,6 +141,11 @@ def calculate_and_set_camera_position(text_object, cursor_object, camera_object,
 try:
     argv = sys.argv
     argv = argv[argv.index("--") + 1:]
+    render_engine = RENDER_ENGINE
+    if "--engine" in argv:
+        idx = argv.index("--engine")
+        render_engine = argv[idx + 1]
+        del argv[idx:idx + 2]
     # Add a space at the end so the cursor can blink at the end:
     text_to_animate = argv[0] + " "
 except IndexError:
@@ -205,16 +214,23 @@ bpy.app.handlers.frame_change_post.clear()
 bpy.app.handlers.frame_change_post.append(typewriter_handler)
 
 # --- Configure Render Settings ---
-bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
+# The Cycles profile has its own sample counts, EEVEE samples follow the flag at the top of the file
+if render_profiles.resolve_render_engine(render_engine) == "cycles":
+    print("--- Rendering with Cycles on the CPU ---")
+    render_profiles.setup_cycles_cpu(bpy.context.scene, IS_FAST_MODE)
+else:
+    bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
+    if IS_FAST_MODE:
+        bpy.context.scene.eevee.taa_render_samples = 8
+    else:
+        bpy.context.scene.eevee.taa_render_samples = 128 # A good default for quality
 
 # Set render quality based on the flag at the top of the file
 if IS_FAST_MODE:
     print("--- Running in FAST TEST mode ---")
-    bpy.context.scene.eevee.taa_render_samples = 8
     bpy.context.scene.render.resolution_percentage = 50
 else:
     print("--- Running in HIGH QUALITY mode ---")
-    bpy.context.scene.eevee.taa_render_samples = 128 # A good default for quality
     bpy.context.scene.render.resolution_percentage = 100
 
 bpy.context.scene.render.image_settings.file_format = 'FFMPEG'